@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+bench/generate.py
+ ------------------------------------------------------------
+ Descripción:
+
+Generador de datasets sintéticos para los benchmarks. Controla el número de
+filas, atributos categóricos y numéricos, la cardinalidad de cada atributo,
+el número de clases y el sesgo (skew) de su distribución.
+
+Cada atributo depende de la clase con probabilidad `signal`, de modo que el
+clasificador tiene algo que aprender; el resto de los valores son ruido uniforme.
+
+Uso:
+    python bench/generate.py salida.csv --rows 100000 --attrs 8 --cardinality 50
+                             --classes 4 --skew 1.0 [--numeric 2] [--seed 0]
+"""
+
+from __future__ import annotations
+import argparse
+from pathlib import Path
+from typing import List
+import numpy as np
+import pandas as pd
+
+# Pesos de las clases: p_k ∝ 1 / (k + 1)^skew (skew = 0 -> clases balanceadas)
+def class_weights(classes: int, skew: float) -> np.ndarray:
+    w = 1.0 / np.arange(1, classes + 1, dtype=float) ** skew
+    return w / w.sum()
+
+# Construye el DataFrame sintético. cardinality puede ser un entero (igual para todos
+# los atributos) o una lista con la cardinalidad de cada atributo categórico
+def generate(rows: int, attrs: int = 8, cardinality: int | List[int] = 20, classes: int = 3,
+             skew: float = 0.0, numeric: int = 0, signal: float = 0.3, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    cards = [cardinality] * attrs if isinstance(cardinality, int) else list(cardinality)
+    if len(cards) != attrs:
+        raise ValueError("La lista de cardinalidades debe tener un valor por atributo.")
+
+    y = rng.choice(classes, size=rows, p=class_weights(classes, skew))
+    data = {}
+    for i, card in enumerate(cards):
+        card = max(1, int(card))
+        noise = rng.integers(0, card, size=rows)
+        # Valor ligado a la clase: un bloque de la cardinalidad distinto por clase
+        span = max(1, card // classes)
+        linked = (y * span + rng.integers(0, span, size=rows)) % card
+        codes = np.where(rng.random(rows) < signal, linked, noise)
+        labels = np.array([f"v{i}_{k}" for k in range(card)], dtype=object)
+        data[f"A{i}"] = pd.Categorical.from_codes(codes, categories=labels)
+    for i in range(numeric):
+        data[f"N{i}"] = np.round(rng.normal(loc=y * 1.5, scale=2.0, size=rows), 3)
+    data["Clase"] = pd.Categorical.from_codes(y, categories=[f"c{k}" for k in range(classes)])
+    return pd.DataFrame(data)
+
+# Escribe el dataset según la extensión (.csv, .xlsx u .ods)
+def write_dataset(df: pd.DataFrame, path: str | Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ext = path.suffix.lower()
+    if ext == ".csv":
+        df.to_csv(path, index=False)
+    elif ext == ".xlsx":
+        df.to_excel(path, index=False, engine="openpyxl")
+    elif ext == ".ods":
+        df.to_excel(path, index=False, engine="odf")
+    else:
+        raise ValueError(f"Formato no soportado: {ext}")
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera un dataset sintético para benchmarks")
+    parser.add_argument("out", help="archivo de salida (.csv, .xlsx, .ods)")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--attrs", type=int, default=8)
+    parser.add_argument("--cardinality", default="20",
+                        help="entero o lista separada por comas (una por atributo)")
+    parser.add_argument("--classes", type=int, default=3)
+    parser.add_argument("--skew", type=float, default=0.0)
+    parser.add_argument("--numeric", type=int, default=0, help="atributos numéricos adicionales")
+    parser.add_argument("--signal", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cards = [int(c) for c in args.cardinality.split(",")]
+    df = generate(args.rows, args.attrs, cards[0] if len(cards) == 1 else cards, args.classes,
+                  args.skew, args.numeric, args.signal, args.seed)
+    path = write_dataset(df, args.out)
+    print(f"[OK] Dataset sintético: {path} ({len(df)} filas, {df.shape[1]} columnas)")
+
+if __name__ == "__main__":
+    main()
+# ---------------------------------------------------------------------------------
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+bench/run.py
+ ------------------------------------------------------------
+ Descripción:
+
+Benchmark por etapas del pipeline sobre datasets sintéticos (bench/generate.py)
+a distintas escalas. Cada etapa se mide por separado:
+
+  load_dataset, _detect_table, discretize, compute_priors, conditional_tables,
+  fit_model, evaluate_instance, predict_batch, sweep_alpha (10 valores de alpha
+  sobre el lote, sin reajustar) y write_tex (generación del .tex)
+
+Los resultados se guardan en JSON. Con --baseline se comparan contra una
+ejecución anterior y el proceso termina con código 1 si alguna etapa es más
+lenta que la referencia por encima de la tolerancia.
+
+Uso:
+    python bench/run.py [--scales 1000,10000,100000] [--out bench/results/latest.json]
+                        [--baseline bench/baseline.json] [--tolerance 0.25]
+                        [--save-baseline bench/baseline.json]
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import pandas as pd
+from bench.generate import generate, write_dataset
+from src.loader import load_dataset, _detect_table
+from src.preprocess import discretize
+from src.bayes import compute_priors, conditional_tables, evaluate_instance, fit_model, predict_batch, sweep_alpha
+from src.report_latex import write_tex
+
+TARGET = "Clase"
+SWEEP_ALPHAS = [0, 0.01, 0.1, 0.25, 0.5, 1, 2, 5, 10, 100]
+
+# Ejecuta fn repeat veces y devuelve (mejor tiempo en segundos, último resultado)
+def timed(fn, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+# Mide todas las etapas para un dataset de `rows` filas
+def bench_scale(rows: int, args, workdir: Path):
+    df_src = generate(rows, args.attrs, args.cardinality, args.classes, args.skew, args.numeric, seed=args.seed)
+    csv_path = write_dataset(df_src, workdir / f"synthetic_{rows}.csv")
+    raw = pd.read_csv(csv_path, encoding="utf-8", header=None)
+    attrs = [c for c in df_src.columns if c != TARGET]
+    numeric = [c for c in attrs if c.startswith("N")]
+    instances = df_src[attrs].sample(n=min(args.instances, rows), random_state=args.seed)
+    batch = df_src[attrs].sample(n=min(args.batch, rows), replace=rows < args.batch, random_state=args.seed)
+
+    results = {}
+    results["load_dataset"], df = timed(lambda: load_dataset(str(csv_path)), args.repeat)
+    results["_detect_table"], _ = timed(lambda: _detect_table(raw), args.repeat)
+    results["discretize"], (df_disc, _) = timed(lambda: discretize(df, numeric, bins=5), args.repeat)
+    results["compute_priors"], priors = timed(lambda: compute_priors(df_disc, TARGET), args.repeat)
+    results["conditional_tables"], (conds, raw_counts) = timed(
+        lambda: conditional_tables(df_disc, TARGET, attrs, alpha=1.0), args.repeat)
+    results["fit_model"], model = timed(lambda: fit_model(df, TARGET, attrs, alpha=1.0, numeric_attrs=numeric),
+                                        args.repeat)
+
+    # Instancias con los valores discretizados (mismo vocabulario que las tablas)
+    disc_rows = df_disc.loc[instances.index, attrs].astype(str).to_dict("records")
+    results["evaluate_instance"], _ = timed(
+        lambda: [evaluate_instance(priors, conds, inst) for inst in disc_rows], args.repeat)
+    results["predict_batch"], _ = timed(lambda: predict_batch(model, batch), args.repeat)
+    # Barrido de alpha: incluye derivar las tablas suavizadas (sin la caché LRU del modelo)
+    results["sweep_alpha"], _ = timed(lambda: (model._cache.pop("log_probs", None),
+                                               sweep_alpha(model, batch, SWEEP_ALPHAS)), args.repeat)
+
+    inst, post = disc_rows[0], evaluate_instance(priors, conds, disc_rows[0])[1]
+    results["write_tex"], _ = timed(
+        lambda: write_tex(str(workdir / "reporte.pdf"), df_disc, TARGET, attrs, priors, conds, inst, post,
+                          raw_counts), args.repeat)
+    return results
+
+# Compara contra una referencia; devuelve la lista de regresiones
+def compare(current: list, baseline: list, tolerance: float, min_seconds: float):
+    ref = {(r["rows"], r["stage"]): r["seconds"] for r in baseline}
+    regressions = []
+    print(f"\n{'filas':>10}  {'etapa':<20}{'actual':>10}{'base':>10}{'cambio':>9}")
+    for r in current:
+        base = ref.get((r["rows"], r["stage"]))
+        if base is None:
+            continue
+        change = r["seconds"] / base - 1 if base > 0 else 0.0
+        slow = change > tolerance and r["seconds"] > min_seconds
+        mark = "  [REGRESIÓN]" if slow else ""
+        print(f"{r['rows']:>10}  {r['stage']:<20}{r['seconds']:>10.4f}{base:>10.4f}{change:>+8.0%}{mark}")
+        if slow:
+            regressions.append(r)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark por etapas sobre datasets sintéticos")
+    parser.add_argument("--scales", default="1000,10000,100000",
+                        help="filas por escala, separadas por comas (ej. 1000,...,10000000)")
+    parser.add_argument("--attrs", type=int, default=8)
+    parser.add_argument("--cardinality", type=int, default=50)
+    parser.add_argument("--classes", type=int, default=4)
+    parser.add_argument("--skew", type=float, default=1.0)
+    parser.add_argument("--numeric", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--instances", type=int, default=100, help="instancias para evaluate_instance")
+    parser.add_argument("--batch", type=int, default=10_000, help="instancias para predict_batch")
+    parser.add_argument("--repeat", type=int, default=3, help="repeticiones por etapa (se toma la mejor)")
+    parser.add_argument("--out", default=str(ROOT / "bench" / "results" / "latest.json"))
+    parser.add_argument("--baseline", help="JSON de referencia para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="lentitud admitida (0.25 = +25%%)")
+    parser.add_argument("--min-seconds", type=float, default=0.005,
+                        help="etapas más rápidas que esto no cuentan como regresión (ruido)")
+    parser.add_argument("--save-baseline", help="además guarda los resultados como referencia")
+    args = parser.parse_args()
+
+    scales = [int(float(s)) for s in args.scales.split(",") if s.strip()]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in scales:
+            for stage, secs in bench_scale(rows, args, Path(tmp)).items():
+                results.append({"rows": rows, "stage": stage, "seconds": round(secs, 6)})
+                print(f"{rows:>10}  {stage:<20}{secs:>10.4f} s")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "params": {k: getattr(args, k) for k in
+                       ("attrs", "cardinality", "classes", "skew", "numeric", "seed", "instances", "batch", "repeat")},
+        },
+        "results": results,
+    }
+    for path in filter(None, [args.out, args.save_baseline]):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"[OK] Resultados: {path}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        if baseline.get("meta", {}).get("params") != report["meta"]["params"]:
+            print("[WARN] La referencia se generó con otros parámetros; la comparación puede no ser válida.")
+        regressions = compare(results, baseline["results"], args.tolerance, args.min_seconds)
+        if regressions:
+            print(f"[ERROR] {len(regressions)} etapa(s) más lentas que la referencia (+{args.tolerance:.0%})")
+            sys.exit(1)
+        print("[OK] Sin regresiones respecto a la referencia")
+
+if __name__ == "__main__":
+    main()
+# ---------------------------------------------------------------------------------
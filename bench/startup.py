@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+bench/startup.py
+ ------------------------------------------------------------
+ Descripción:
+
+Mide el arranque del camino de solo puntuación (modelo guardado con MODEL_IN,
+sin reporte):
+  - Tiempo de importación de src.main con `python -X importtime`
+  - Módulos pesados cargados al arrancar (pandas, el generador LaTeX, etc.)
+  - Tiempo total de una ejecución completa de `python -m src.main`
+
+Termina con código 1 si se carga un módulo pesado o si la mediana supera
+--max-ms, para detectar regresiones.
+
+Uso:
+    python bench/startup.py [--dataset data/musica.ods] [--runs 10] [--max-ms 0]
+"""
+
+from __future__ import annotations
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Módulos que no deben cargarse al puntuar con un modelo guardado
+HEAVY = ("pandas", "openpyxl", "odf", "src.loader", "src.preprocess", "src.report_latex")
+
+# Ajusta y guarda un modelo de prueba; devuelve la ruta de la configuración de puntuación
+def prepare(dataset: str, sheet: str | None, target: str | None, workdir: Path) -> Path:
+    sys.path.insert(0, str(ROOT))
+    from src.loader import load_dataset
+    from src.bayes import fit_model
+    from src.model_store import save_model
+
+    df = load_dataset(dataset, sheet)
+    target = target or df.columns[-1]
+    attrs = [c for c in df.columns if c != target]
+    model = fit_model(df, target, attrs, alpha=1.0)
+    save_model(model, workdir / "model")
+
+    row = df.iloc[0]
+    cfg = workdir / "score.txt"
+    lines = [f"MODEL_IN={workdir / 'model'}", "", "INSTANCE:"]
+    lines += [f"  {a}={row[a]}" for a in attrs]
+    cfg.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return cfg
+
+# Importación de src.main con -X importtime: (tiempo acumulado en ms, módulos más lentos)
+def import_profile(top: int = 10):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import src.main"],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1000, name.strip()))
+    total = next((ms for ms, name in rows if name == "src.main"), 0.0)
+    slowest = [(ms, name) for ms, name in rows if name not in ("src", "src.main")]
+    return total, sorted(slowest, reverse=True)[:top]
+
+# Módulos pesados presentes en sys.modules tras una puntuación completa
+def loaded_heavy(cfg: Path):
+    code = ("import sys, io, contextlib; sys.argv = ['src.main', %r]\n"
+            "from src.main import main\n"
+            "with contextlib.redirect_stdout(io.StringIO()): main()\n"
+            "print(','.join(m for m in %r if m in sys.modules))") % (str(cfg), HEAVY)
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return [m for m in proc.stdout.strip().split(",") if m]
+
+# Tiempo de pared de `python -m src.main` (ms) repetido runs veces
+def wall_times(cfg: Path, runs: int):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "src.main", str(cfg)], cwd=ROOT,
+                       stdout=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque del camino de puntuación")
+    parser.add_argument("--dataset", default="data/musica.ods")
+    parser.add_argument("--sheet", default="Sheet4")
+    parser.add_argument("--target", default=None)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=0.0,
+                        help="falla si la mediana supera este valor (0 = sin límite)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cfg = prepare(str(ROOT / args.dataset), args.sheet, args.target, Path(tmp))
+        import_ms, slowest = import_profile()
+        heavy = loaded_heavy(cfg)
+        times = wall_times(cfg, max(1, args.runs))
+
+    median = statistics.median(times)
+    print(f"Importación de src.main: {import_ms:8.1f} ms")
+    for ms, name in slowest:
+        print(f"  {ms:8.1f} ms  {name}")
+    print(f"Puntuación completa ({len(times)} ejecuciones): mediana {median:.1f} ms, "
+          f"mín {min(times):.1f} ms, máx {max(times):.1f} ms")
+
+    failed = False
+    if heavy:
+        print(f"[ERROR] Módulos pesados cargados al puntuar: {', '.join(heavy)}")
+        failed = True
+    else:
+        print("[OK] Sin módulos pesados en el camino de puntuación")
+    if args.max_ms and median > args.max_ms:
+        print(f"[ERROR] La mediana ({median:.1f} ms) supera el límite de {args.max_ms:.1f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
+# ---------------------------------------------------------------------------------
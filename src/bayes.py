@@ -15,9 +15,20 @@
 """
 
 from __future__ import annotations
-from dataclasses import dataclass
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from typing import Dict, List, Tuple
-import pandas as pd
+import numpy as np
+from .profiling import stage
+from .utils import LazyModule
+
+# pandas solo se carga al ajustar el modelo o generar tablas; la evaluación
+# de instancias sobre un modelo guardado no lo necesita
+pd = LazyModule("pandas")
+
+ALPHA_CACHE_SIZE = 16 # Valores de alpha con log-probabilidades suavizadas en caché (LRU)
 
 # Estructura de datos para almacenar los resultados del algoritmo Bayesiano
 @dataclass
@@ -27,6 +38,8 @@ class BayesResult:
     raw_counts: Dict[str, pd.DataFrame] # Tablas con los conteos originales
     scores: Dict[str, float] # Valor sin normalizar de cada clase
     posteriors: Dict[str, float] # Probabilidades a posteriori normalizadas
+    log_scores: Dict[str, float] = field(default_factory=dict) # log del valor sin normalizar
+    gaussian: Dict[str, pd.DataFrame] = field(default_factory=dict) # Media/varianza por clase (atributos numéricos)
 
 # Calcula las probabilidades a priori de cada clase P(Y)
 def compute_priors(df: pd.DataFrame, target: str) -> Dict[str, float]:
@@ -36,37 +49,601 @@ def compute_priors(df: pd.DataFrame, target: str) -> Dict[str, float]:
 
 # Genera las tablas de probabilidad condicional P(X|Y) y sus conteos
 def conditional_tables(df: pd.DataFrame, target: str, attrs: List[str], alpha: float = 0.0):
-    cond_probs, raw_counts = {}, {}
+    model = fit_model(df, target, attrs, alpha)
+    return model.cond_tables, model.raw_counts
+
+# Factoriza una columna a códigos enteros y etiquetas de texto (orden de primera aparición).
+# Etiquetas que coinciden al convertirse a str se fusionan, igual que con astype(str)
+def _factorize(values: pd.Series):
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    label_codes, labels = pd.factorize(np.array([str(u) for u in uniques], dtype=object))
+    return label_codes[codes].astype(np.int64), [str(v) for v in labels]
+
+# Traduce los valores de una columna a índices de un vocabulario existente.
+# Con grow=True los valores nuevos se agregan al final; si no, se rechazan
+def _map_labels(values: pd.Series, known: List[str], index: Dict[str, int], grow: bool) -> np.ndarray:
+    codes, labels = _factorize(values)
+    mapping = np.empty(len(labels), dtype=np.int64)
+    for k, label in enumerate(labels):
+        j = index.get(label)
+        if j is None:
+            if not grow:
+                raise ValueError(f"El valor '{label}' no forma parte del modelo.")
+            j = index[label] = len(known)
+            known.append(label)
+        mapping[k] = j
+    return mapping[codes]
+
+# Copia un arreglo de conteos rellenando con ceros hasta la forma indicada
+def _grow(arr: np.ndarray, shape) -> np.ndarray:
+    out = np.zeros(shape, dtype=np.int64)
+    out[tuple(slice(0, n) for n in arr.shape)] = arr
+    return out
+
+# Estadísticos suficientes por clase de un atributo numérico: [n, media, M2] por fila.
+# Los valores faltantes (NaN) no cuentan
+def gaussian_stats(y: np.ndarray, x: np.ndarray, n_classes: int) -> np.ndarray:
+    valid = ~np.isnan(x)
+    y, x = y[valid], x[valid]
+    n = np.bincount(y, minlength=n_classes).astype(float)
+    mean = np.divide(np.bincount(y, weights=x, minlength=n_classes), n,
+                     out=np.zeros(n_classes), where=n > 0)
+    m2 = np.bincount(y, weights=(x - mean[y]) ** 2, minlength=n_classes)
+    return np.column_stack([n, mean, m2])
+
+# Combina dos conjuntos de estadísticos [n, media, M2] (fórmula de Chan/Welford)
+def merge_stats(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    na, ma, m2a = a[:, 0], a[:, 1], a[:, 2]
+    nb, mb, m2b = b[:, 0], b[:, 1], b[:, 2]
+    n = na + nb
+    delta = mb - ma
+    safe_n = np.where(n > 0, n, 1.0)
+    mean = ma + delta * nb / safe_n
+    m2 = m2a + m2b + delta ** 2 * na * nb / safe_n
+    return np.column_stack([n, mean, m2])
+
+# Estadísticos [n, media, M2] de todas las clases juntas
+def merge_stats_all(stats: np.ndarray) -> np.ndarray:
+    total = np.zeros((1, 3))
+    for row in np.asarray(stats):
+        total = merge_stats(total, row[None, :])
+    return total[0]
+
+# Operación inversa de merge_stats: quita de total los estadísticos de part
+def subtract_stats(total: np.ndarray, part: np.ndarray) -> np.ndarray:
+    n, mean, m2 = total[:, 0], total[:, 1], total[:, 2]
+    nb, mb, m2b = part[:, 0], part[:, 1], part[:, 2]
+    na = n - nb
+    safe_na = np.where(na > 0, na, 1.0)
+    ma = np.where(na > 0, (n * mean - nb * mb) / safe_na, 0.0)
+    delta = mb - ma
+    m2a = np.where(na > 0, m2 - m2b - delta ** 2 * na * nb / np.where(n > 0, n, 1.0), 0.0)
+    return np.column_stack([na, ma, np.maximum(m2a, 0.0)])
+
+# Copia un arreglo de estadísticos agregando clases vacías (n = 0) hasta n_classes
+def _grow_stats(stats: np.ndarray, n_classes: int) -> np.ndarray:
+    out = np.zeros((n_classes, 3))
+    out[:len(stats)] = stats
+    return out
+
+# Valores numéricos de una columna (lo no numérico se trata como faltante)
+def _as_float(values: pd.Series) -> np.ndarray:
+    return pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+
+# Convierte un valor suelto a número (NaN si no es numérico), sin pasar por pandas
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+# Cuenta un grupo de atributos contra los códigos de clase y. Es la unidad de trabajo
+# de cada proceso cuando el ajuste es paralelo; en serie se llama con todos los atributos
+def _count_group(y: np.ndarray, n_classes: int, columns: Dict[str, pd.Series], numeric_attrs=()):
+    out = {}
+    for attr, col in columns.items():
+        if attr in numeric_attrs:
+            out[attr] = ("gaussian", gaussian_stats(y, _as_float(col), n_classes))
+            continue
+        x, labels = _factorize(col)
+        n_values = len(labels)
+        flat = np.bincount(y * n_values + x, minlength=n_classes * n_values)
+        out[attr] = ("counts", labels, flat.reshape(n_classes, n_values))
+    return out
+
+# Construye todas las matrices de conteo clase×valor en una sola pasada:
+# cada columna se factoriza una vez y se cuenta con np.bincount sobre códigos combinados.
+# Los atributos de numeric_attrs guardan en cambio estadísticos gaussianos por clase.
+# Con workers > 1 los atributos se reparten en grupos entre procesos; cada atributo se
+# cuenta completo en un solo proceso, así que el resultado es idéntico al serial
+def count_tables(df: pd.DataFrame, target: str, attrs: List[str], numeric_attrs=(), workers: int = 1):
+    with stage("factorize_target"):
+        y, classes = _factorize(df[target])
+        n_classes = len(classes)
+        class_counts = np.bincount(y, minlength=n_classes)
+    numeric_attrs = tuple(numeric_attrs)
+
+    with stage("count_attributes"):
+        if workers > 1 and len(attrs) > 1:
+            from concurrent.futures import ProcessPoolExecutor # Solo se carga en modo paralelo
+            groups = [attrs[i::workers] for i in range(min(workers, len(attrs)))]
+            results = {}
+            with ProcessPoolExecutor(max_workers=len(groups)) as pool:
+                futures = [
+                    pool.submit(_count_group, y, n_classes, {a: df[a] for a in group}, numeric_attrs)
+                    for group in groups
+                ]
+                for future in futures:
+                    results.update(future.result())
+        else:
+            results = _count_group(y, n_classes, {a: df[a] for a in attrs}, numeric_attrs)
+
+    values, counts, stats = {}, {}, {}
     for attr in attrs:
-        tmp = df[[attr, target]].astype(str).value_counts().rename("count").reset_index()
-        pivot = tmp.pivot(index=target, columns=attr, values="count").fillna(0)
-        raw_counts[attr] = pivot.copy()
+        kind, *data = results[attr]
+        if kind == "gaussian":
+            stats[attr] = data[0]
+        else:
+            values[attr], counts[attr] = data
+    return classes, class_counts, values, counts, stats
+
+# log densidad normal, vectorizada: x [n] contra medias/varianzas por clase [k] -> [n, k].
+# Valores faltantes y clases sin datos del atributo aportan 0 (neutro)
+def gaussian_log_pdf(x: np.ndarray, mean: np.ndarray, var: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ll = -0.5 * (np.log(2 * np.pi * var)[None, :] + (x[:, None] - mean[None, :]) ** 2 / var[None, :])
+    ll[np.isnan(x)] = 0.0
+    ll[:, ~(var > 0)] = 0.0
+    return ll
 
-        if alpha > 0:
-            pivot = pivot + alpha
-        prob = pivot.div(pivot.sum(axis=1), axis=0).fillna(0.0)
-        cond_probs[attr] = prob
-    return cond_probs, raw_counts
+# Normaliza log-puntajes por fila con log-sum-exp; filas sin soporte quedan en 0
+def _normalize_log_scores(log_scores: np.ndarray) -> np.ndarray:
+    m = log_scores.max(axis=-1, keepdims=True)
+    m = np.where(np.isfinite(m), m, 0.0)
+    e = np.exp(log_scores - m)
+    total = e.sum(axis=-1, keepdims=True)
+    return np.divide(e, total, out=np.zeros_like(e), where=total > 0)
 
-# Evalúa una instancia aplicando la regla de Bayes
+# Convierte log-puntajes por clase en los diccionarios de BayesResult
+def _score_dicts(classes: List[str], log_scores: np.ndarray):
+    post = _normalize_log_scores(log_scores)
+    scores = {c: float(np.exp(s)) for c, s in zip(classes, log_scores)}
+    logs = {c: float(s) for c, s in zip(classes, log_scores)}
+    return scores, {c: float(p) for c, p in zip(classes, post)}, logs
+
+# Evalúa una instancia aplicando la regla de Bayes en espacio logarítmico
 def evaluate_instance(priors, conds, instance):
-    scores = {}
-    for c, p_y in priors.items():
-        prod = p_y
+    classes = list(priors)
+    with np.errstate(divide="ignore"): # log(0) = -inf para valores sin soporte
+        log_scores = np.log(np.array([priors[c] for c in classes], dtype=float))
         for attr, val in instance.items():
             tbl = conds[attr]
-            p = float(tbl.loc[c].get(str(val), 0.0)) if c in tbl.index else 0.0
-            prod *= p
-        scores[c] = prod
-    total = sum(scores.values()) # Normalización para obtener las probabilidades a posteriori
-    post = {c: (s / total if total > 0 else 0.0) for c, s in scores.items()}
+            probs = [float(tbl.loc[c].get(str(val), 0.0)) if c in tbl.index else 0.0 for c in classes]
+            log_scores += np.log(probs)
+    scores, post, _ = _score_dicts(classes, log_scores)
     return scores, post
 
+# Modelo ajustado una sola vez (por dataset/target/atributos/alpha) y reutilizable
+# para evaluar cualquier número de instancias sin volver a recorrer el DataFrame.
+# Los conteos son la representación base; probabilidades y tablas se derivan bajo demanda
+@dataclass
+class NaiveBayesModel:
+    target: str # Columna de clase
+    attrs: List[str] # Atributos usados en el ajuste
+    alpha: float # Parámetro de suavizado de Laplace
+    classes: List[str] # Clases en orden de primera aparición
+    class_counts: np.ndarray # Número de filas por clase
+    values: Dict[str, List[str]] # Vocabulario de cada atributo (orden de primera aparición)
+    counts: Dict[str, np.ndarray] # Conteos [n_clases, n_valores] por atributo
+    edges: Dict[str, np.ndarray] = field(default_factory=dict) # Bordes de discretización por atributo
+    gaussian: Dict[str, np.ndarray] = field(default_factory=dict) # [n, media, M2] por clase (atributos numéricos)
+    _cache: Dict[str, object] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    # Devuelve un valor derivado, construyéndolo solo la primera vez
+    def _cached(self, key: str, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    # Atributos modelados con tablas de conteo (los demás son gaussianos)
+    @property
+    def categorical_attrs(self) -> List[str]:
+        return [a for a in self.attrs if a not in self.gaussian]
+
+    # Índice de cada clase en los arreglos de conteo
+    @property
+    def class_index(self) -> Dict[str, int]:
+        return self._cached("class_index", lambda: {c: i for i, c in enumerate(self.classes)})
+
+    # Número total de filas usadas en el ajuste
+    @property
+    def n_rows(self) -> int:
+        return int(self.class_counts.sum())
+
+    # Índices de las clases por frecuencia descendente (estable), como value_counts
+    @property
+    def class_order(self) -> np.ndarray:
+        return self._cached("class_order", lambda: np.argsort(-self.class_counts, kind="stable"))
+
+    # Clases en el orden de las priors; es el orden de filas de log_priors/log_probs
+    @property
+    def ranked_classes(self) -> List[str]:
+        return [self.classes[i] for i in self.class_order]
+
+    # Probabilidades a priori de cada clase P(Y)
+    @property
+    def priors(self) -> Dict[str, float]:
+        total = self.n_rows
+        return {self.classes[i]: float(self.class_counts[i] / total) for i in self.class_order}
+
+    # Índice de columna de cada valor por atributo
+    @property
+    def vocab(self) -> Dict[str, Dict[str, int]]:
+        return self._cached("vocab", lambda: {
+            a: {v: j for j, v in enumerate(labels)} for a, labels in self.values.items()
+        })
+
+    # P(A=v|y) suavizado para un atributo, [n_clases, n_valores] en orden de almacenamiento.
+    # Por defecto con el alpha del modelo; los conteos no cambian con alpha
+    def probabilities(self, attr: str, alpha: float | None = None) -> np.ndarray:
+        alpha = self.alpha if alpha is None else alpha
+        smoothed = self.counts[attr] + alpha if alpha > 0 else self.counts[attr].astype(float)
+        totals = smoothed.sum(axis=1, keepdims=True)
+        return np.divide(smoothed, totals, out=np.zeros(smoothed.shape), where=totals > 0)
+
+    # log P(y) en el orden de ranked_classes
+    @property
+    def log_priors(self) -> np.ndarray:
+        def build():
+            with np.errstate(divide="ignore"):
+                return np.log(self.class_counts[self.class_order] / self.n_rows)
+        return self._cached("log_priors", build)
+
+    # log P(A=v|y) suavizado por atributo, filas en el orden de ranked_classes
+    @property
+    def log_probs(self) -> Dict[str, np.ndarray]:
+        return self.log_probs_for(self.alpha)
+
+    # log P(A=v|y) suavizado con cualquier alpha, derivado de los conteos. Guarda los
+    # ALPHA_CACHE_SIZE valores de alpha usados más recientemente (LRU)
+    def log_probs_for(self, alpha: float) -> Dict[str, np.ndarray]:
+        lru = self._cached("log_probs", OrderedDict)
+        alpha = float(alpha)
+        if alpha in lru:
+            lru.move_to_end(alpha)
+            return lru[alpha]
+        with np.errstate(divide="ignore"): # log(0) = -inf para valores sin soporte
+            tables = {a: np.log(self.probabilities(a, alpha)[self.class_order]) for a in self.categorical_attrs}
+        lru[alpha] = tables
+        while len(lru) > ALPHA_CACHE_SIZE:
+            lru.popitem(last=False)
+        return tables
+
+    # Media y varianza por clase de cada atributo gaussiano, filas en el orden de ranked_classes.
+    # Como en scikit-learn, se suma a la varianza 1e-9 veces la varianza total del atributo
+    @property
+    def gaussian_params(self) -> Dict[str, tuple]:
+        def build():
+            params = {}
+            for attr, st in self.gaussian.items():
+                st = np.asarray(st)[self.class_order]
+                n, mean = st[:, 0], st[:, 1]
+                var = np.divide(st[:, 2], n, out=np.zeros(len(n)), where=n > 0)
+                pooled = merge_stats_all(st)
+                eps = 1e-9 * max(pooled[2] / pooled[0] if pooled[0] > 0 else 0.0, 1.0)
+                params[attr] = (mean, np.where(n > 0, var + eps, 0.0))
+            return params
+        return self._cached("gaussian_params", build)
+
+    # Convierte una matriz por atributo en DataFrame (clases y valores ordenados) para el reporte
+    def _table(self, attr: str, matrix: np.ndarray) -> pd.DataFrame:
+        rows = sorted(range(len(self.classes)), key=self.classes.__getitem__)
+        labels = self.values[attr]
+        if attr in self.edges:
+            from .preprocess import interval_labels
+            # Intervalos en orden numérico; cualquier otro valor al final
+            order = {v: i for i, v in enumerate(interval_labels(self.edges[attr]))}
+            key = lambda j: (order.get(labels[j], len(order)), labels[j])
+        else:
+            key = labels.__getitem__
+        cols = sorted(range(len(labels)), key=key)
+        return pd.DataFrame(
+            matrix[np.ix_(rows, cols)],
+            index=pd.Index([self.classes[i] for i in rows], name=self.target),
+            columns=pd.Index([self.values[attr][j] for j in cols], name=attr),
+        )
+
+    # Tablas de probabilidad condicional como DataFrames (solo para el reporte)
+    @property
+    def cond_tables(self) -> Dict[str, pd.DataFrame]:
+        return self._cached("cond_tables", lambda: {
+            a: self._table(a, self.probabilities(a)) for a in self.categorical_attrs
+        })
+
+    # Tablas con los conteos originales como DataFrames (solo para el reporte)
+    @property
+    def raw_counts(self) -> Dict[str, pd.DataFrame]:
+        return self._cached("raw_counts", lambda: {
+            a: self._table(a, self.counts[a]) for a in self.categorical_attrs
+        })
+
+    # Media y varianza por clase de los atributos gaussianos como DataFrames (para el reporte)
+    @property
+    def gaussian_tables(self) -> Dict[str, pd.DataFrame]:
+        def build():
+            rows = sorted(range(len(self.classes)), key=self.classes.__getitem__)
+            ranked_pos = np.argsort(self.class_order)
+            tables = {}
+            for attr, (mean, var) in self.gaussian_params.items():
+                idx = ranked_pos[rows]
+                tables[attr] = pd.DataFrame(
+                    {"media": mean[idx], "varianza": var[idx]},
+                    index=pd.Index([self.classes[i] for i in rows], name=self.target),
+                )
+            return tables
+        return self._cached("gaussian_tables", build)
+
+    # Huella (hash) del contenido del modelo: cambia si cambian conteos, vocabularios,
+    # estadísticos, bordes o alpha. Sirve como clave de cachés derivados (p. ej. el reporte)
+    def fingerprint(self) -> str:
+        def build():
+            h = hashlib.sha1()
+            header = [self.target, list(self.attrs), self.alpha, list(self.classes),
+                      {a: list(self.values[a]) for a in self.categorical_attrs}]
+            h.update(json.dumps(header, ensure_ascii=False).encode("utf-8"))
+            h.update(np.ascontiguousarray(self.class_counts, dtype=np.int64).tobytes())
+            for attr in self.attrs:
+                if attr in self.gaussian:
+                    h.update(np.ascontiguousarray(self.gaussian[attr], dtype=float).tobytes())
+                else:
+                    h.update(np.ascontiguousarray(self.counts[attr], dtype=np.int64).tobytes())
+                if attr in self.edges:
+                    h.update(np.ascontiguousarray(self.edges[attr], dtype=float).tobytes())
+            return h.hexdigest()
+        return self._cached("fingerprint", build)
+
+    # Modelo con un subconjunto de atributos y otro alpha que reutiliza los conteos ya
+    # calculados (los arreglos se comparten; las listas se copian porque partial_fit las
+    # extiende). Es idéntico a ajustar de nuevo con esos atributos sobre los mismos datos
+    def subset(self, attrs: List[str], alpha: float | None = None) -> NaiveBayesModel:
+        missing = [a for a in attrs if a not in self.attrs]
+        if missing:
+            raise KeyError(f"Atributos no presentes en el modelo: {missing}")
+        return NaiveBayesModel(
+            self.target, list(attrs), self.alpha if alpha is None else alpha, list(self.classes),
+            self.class_counts,
+            {a: list(self.values[a]) for a in attrs if a in self.values},
+            {a: self.counts[a] for a in attrs if a in self.counts},
+            {a: self.edges[a] for a in attrs if a in self.edges},
+            {a: self.gaussian[a] for a in attrs if a in self.gaussian},
+        )
+
+    # Aplica los bordes de discretización del modelo a una columna de valores nuevos
+    def _prepare(self, attr: str, values: pd.Series) -> pd.Series:
+        if attr in self.edges:
+            from .preprocess import discretize_values
+            return discretize_values(values, self.edges[attr])
+        return values
+
+    # Traduce los valores numéricos de una instancia a los intervalos del modelo
+    def prepare_instance(self, instance: Dict[str, str]) -> Dict[str, str]:
+        prepared = {}
+        for attr, val in instance.items():
+            if attr in self.edges:
+                val = self._prepare(attr, pd.Series([val], dtype=object)).iloc[0]
+            prepared[attr] = val
+        return prepared
+
+    # Verifica que las filas traigan la clase y todos los atributos del modelo
+    def _check_columns(self, rows: pd.DataFrame):
+        missing = [c for c in [self.target, *self.attrs] if c not in rows.columns]
+        if missing:
+            raise KeyError(f"Columnas faltantes en las filas: {missing}")
+
+    # Incorpora filas nuevas sumando sus conteos. Clases y valores no vistos se agregan
+    # al vocabulario; el resultado es idéntico a reajustar con todos los datos.
+    # Los vocabularios crecen sobre copias y el modelo solo cambia si todo el bloque se
+    # procesó sin errores
+    def partial_fit(self, rows: pd.DataFrame) -> NaiveBayesModel:
+        self._check_columns(rows)
+        classes, class_index = list(self.classes), dict(self.class_index)
+        y = _map_labels(rows[self.target], classes, class_index, grow=True)
+        n_classes = len(classes)
+        class_counts = _grow(self.class_counts, (n_classes,)) + np.bincount(y, minlength=n_classes)
+
+        values, vocab, counts = {}, {}, {}
+        for attr in self.categorical_attrs:
+            values[attr], vocab[attr] = list(self.values[attr]), dict(self.vocab[attr])
+            x = _map_labels(self._prepare(attr, rows[attr]), values[attr], vocab[attr], grow=True)
+            n_values = len(values[attr])
+            delta = np.bincount(y * n_values + x, minlength=n_classes * n_values)
+            counts[attr] = _grow(self.counts[attr], (n_classes, n_values)) + delta.reshape(n_classes, n_values)
+        stats = {
+            a: merge_stats(_grow_stats(st, n_classes), gaussian_stats(y, _as_float(rows[a]), n_classes))
+            for a, st in self.gaussian.items()
+        }
+
+        vocab = {**self.vocab, **vocab}
+        self.classes, self.class_counts = classes, class_counts
+        self.values.update(values)
+        self.counts.update(counts)
+        self.gaussian.update(stats)
+        self._invalidate()
+        self._cache.update(class_index=class_index, vocab=vocab) # Ya reflejan los vocabularios nuevos
+        return self
+
+    # Descuenta filas previamente incorporadas. Clases y valores que quedan sin
+    # ninguna fila se eliminan, igual que si se reajustara sin esas filas
+    def remove(self, rows: pd.DataFrame) -> NaiveBayesModel:
+        self._check_columns(rows)
+        y = _map_labels(rows[self.target], self.classes, self.class_index, grow=False)
+        n_classes = len(self.classes)
+        class_counts = self.class_counts - np.bincount(y, minlength=n_classes)
+
+        counts = {}
+        for attr in self.categorical_attrs:
+            x = _map_labels(self._prepare(attr, rows[attr]), self.values[attr], self.vocab[attr], grow=False)
+            n_values = len(self.values[attr])
+            delta = np.bincount(y * n_values + x, minlength=n_classes * n_values)
+            counts[attr] = self.counts[attr] - delta.reshape(n_classes, n_values)
+        stats = {
+            a: subtract_stats(np.asarray(st), gaussian_stats(y, _as_float(rows[a]), n_classes))
+            for a, st in self.gaussian.items()
+        }
+
+        if ((class_counts < 0).any() or any((c < 0).any() for c in counts.values())
+                or any((st[:, 0] < 0).any() for st in stats.values())):
+            raise ValueError("Las filas a eliminar no forman parte de los datos del modelo.")
+
+        # Poda de clases y valores sin filas
+        keep = class_counts > 0
+        self.classes = [c for c, k in zip(self.classes, keep) if k]
+        self.class_counts = class_counts[keep]
+        for attr in self.categorical_attrs:
+            matrix = counts[attr][keep]
+            used = matrix.sum(axis=0) > 0
+            self.values[attr] = [v for v, u in zip(self.values[attr], used) if u]
+            self.counts[attr] = matrix[:, used]
+        for attr, st in stats.items():
+            self.gaussian[attr] = st[keep]
+        self._invalidate()
+        return self
+
+    # Descarta los valores derivados para recalcularlos en el siguiente uso
+    def _invalidate(self, keep=()):
+        for key in list(self._cache):
+            if key not in keep:
+                del self._cache[key]
+
+    # Puntúa una instancia (suma de log-probabilidades) sin construir las tablas del
+    # reporte; devuelve (scores, posteriores, log-scores) en el orden de ranked_classes
+    def score(self, instance: Dict[str, str]):
+        log_scores = self.log_priors.copy()
+        for attr, val in self.prepare_instance(instance).items():
+            if attr in self.gaussian:
+                mean, var = self.gaussian_params[attr]
+                log_scores += gaussian_log_pdf(np.array([_to_float(val)]), mean, var)[0]
+                continue
+            j = self.vocab[attr].get(str(val))
+            log_scores += self.log_probs[attr][:, j] if j is not None else -np.inf
+        return _score_dicts(self.ranked_classes, log_scores)
+
+    # Evalúa una instancia con el modelo ya ajustado, incluyendo las tablas del reporte
+    def evaluate(self, instance: Dict[str, str]) -> BayesResult:
+        scores, post, logs = self.score(instance)
+        return BayesResult(self.priors, self.cond_tables, self.raw_counts, scores, post, logs,
+                           self.gaussian_tables)
+
+# Ajusta el modelo a partir de los conteos construidos en una sola pasada.
+# edges: bordes de discretización usados en df, para aplicarlos igual a las instancias
+# numeric_attrs: atributos numéricos modelados con una normal por clase.
+# workers: procesos para repartir el conteo de atributos (1 = serial)
+def fit_model(df: pd.DataFrame, target: str, attrs: List[str], alpha: float = 0.0,
+              edges: Dict[str, np.ndarray] | None = None, numeric_attrs=(),
+              workers: int = 1) -> NaiveBayesModel:
+    classes, class_counts, values, counts, stats = count_tables(df, target, attrs, numeric_attrs, workers)
+    return NaiveBayesModel(target, list(attrs), alpha, classes, class_counts, values, counts,
+                           dict(edges or {}), stats)
+
+# Resultado de la predicción por lotes (una fila por instancia)
+@dataclass
+class BatchResult:
+    classes: List[str] # Orden de las columnas de las matrices
+    predictions: np.ndarray # Clase predicha para cada instancia
+    log_scores: np.ndarray # log P(y) + Σ log P(A=v|y), [n_instancias, n_clases]
+    posteriors: np.ndarray # Probabilidades a posteriori, [n_instancias, n_clases]
+
+# Codifica una columna de instancias a índices del vocabulario del atributo.
+# Valor no visto -> n (columna -inf); valor ausente (NaN) -> n + 1 (columna neutra)
+def _encode_column(vocab: Dict[str, int], values: pd.Series) -> np.ndarray:
+    n = len(vocab)
+    codes = pd.Index(list(vocab)).get_indexer(values.astype(str))
+    codes[codes < 0] = n
+    codes[values.isna().to_numpy()] = n + 1
+    return codes
+
+# Resultado de evaluar las mismas instancias con varios valores de alpha
+@dataclass
+class AlphaSweep:
+    alphas: np.ndarray # Valores de alpha evaluados
+    classes: List[str] # Orden de las columnas de las matrices
+    predictions: np.ndarray # Clase predicha, [n_alphas, n_instancias]
+    log_scores: np.ndarray # [n_alphas, n_instancias, n_clases]
+    posteriors: np.ndarray # [n_alphas, n_instancias, n_clases]
+    accuracy: np.ndarray | None = None # Exactitud por alpha (si se dieron las clases reales)
+    log_loss: np.ndarray | None = None # Pérdida logarítmica media por alpha (ídem)
+
+    # Alpha con mayor exactitud (desempate por menor pérdida logarítmica)
+    @property
+    def best_alpha(self) -> float | None:
+        if self.accuracy is None:
+            return None
+        return float(self.alphas[np.lexsort((self.log_loss, -self.accuracy))[0]])
+
+# Exactitud y pérdida logarítmica por alpha; las clases reales que el modelo no conoce
+# cuentan como error (probabilidad recortada a 1e-15, como en scikit-learn)
+def _sweep_metrics(classes: List[str], predictions: np.ndarray, posteriors: np.ndarray, labels):
+    y = np.asarray(labels, dtype=object).astype(str)
+    index = {c: j for j, c in enumerate(classes)}
+    codes = np.array([index.get(v, -1) for v in y], dtype=int)
+    p_true = np.where(codes >= 0, posteriors[:, np.arange(len(y)), np.maximum(codes, 0)], 0.0)
+    accuracy = (predictions.astype(str) == y[None, :]).mean(axis=1)
+    log_loss = -np.log(np.clip(p_true, 1e-15, 1.0)).mean(axis=1)
+    return accuracy, log_loss
+
+# Evalúa las instancias con todos los valores de alpha en una sola pasada: cada columna
+# se codifica una vez y se indexan a la vez las tablas de todos los alpha (derivadas de
+# los conteos, sin reajustar). Con labels se calcula la exactitud y la pérdida por alpha
+def sweep_alpha(model: NaiveBayesModel, instances_df: pd.DataFrame, alphas, labels=None) -> AlphaSweep:
+    alphas = np.asarray(alphas, dtype=float).ravel()
+    if alphas.size == 0 or (alphas < 0).any():
+        raise ValueError("Se requiere al menos un valor de alpha y todos deben ser ≥ 0.")
+    classes = model.ranked_classes
+    n = len(instances_df)
+    base = np.tile(model.log_priors, (n, 1)) # Priors y gaussianos no dependen de alpha
+    per_alpha = np.zeros((len(alphas), n, len(classes)))
+    pad = np.array([[-np.inf, 0.0]] * len(classes))
+
+    for attr in instances_df.columns:
+        if attr in model.gaussian:
+            mean, var = model.gaussian_params[attr]
+            base += gaussian_log_pdf(_as_float(instances_df[attr]), mean, var)
+            continue
+        # Tablas [n_alphas, n_clases, n_valores + 2] y un solo gather para todos los alpha
+        tables = np.stack([np.hstack([model.log_probs_for(a)[attr], pad]) for a in alphas])
+        codes = _encode_column(model.vocab[attr], model._prepare(attr, instances_df[attr]))
+        per_alpha += tables[:, :, codes].transpose(0, 2, 1)
+
+    log_scores = per_alpha + base[None, :, :]
+    posteriors = _normalize_log_scores(log_scores)
+    predictions = np.asarray(classes, dtype=object)[posteriors.argmax(axis=2)]
+    sweep = AlphaSweep(alphas, classes, predictions, log_scores, posteriors)
+    if labels is not None:
+        sweep.accuracy, sweep.log_loss = _sweep_metrics(classes, predictions, posteriors, labels)
+    return sweep
+
+# Clasifica todas las filas de un DataFrame de instancias con operaciones vectorizadas
+def predict_batch(model: NaiveBayesModel, instances_df: pd.DataFrame) -> BatchResult:
+    classes = model.ranked_classes
+    log_scores = np.tile(model.log_priors, (len(instances_df), 1))
+    pad = np.array([[-np.inf, 0.0]] * len(classes))
+
+    for attr in instances_df.columns:
+        if attr in model.gaussian:
+            mean, var = model.gaussian_params[attr]
+            log_scores += gaussian_log_pdf(_as_float(instances_df[attr]), mean, var)
+            continue
+        # Tabla densa [n_clases, n_valores + 2] y gather con indexación avanzada
+        table = np.hstack([model.log_probs[attr], pad])
+        codes = _encode_column(model.vocab[attr], model._prepare(attr, instances_df[attr]))
+        log_scores += table[:, codes].T
+
+    posteriors = _normalize_log_scores(log_scores)
+    predictions = np.asarray(classes, dtype=object)[posteriors.argmax(axis=1)]
+    return BatchResult(classes, predictions, log_scores, posteriors)
+
 # Función principal: ejecuta el flujo completo del clasificador Naive Bayes
 def run_naive_bayes(df, target, attrs, instance, alpha=0.0) -> BayesResult:
-    priors = compute_priors(df, target) 
-    conds, raw_counts = conditional_tables(df, target, attrs, alpha)
-    scores, post = evaluate_instance(priors, conds, instance)
-    return BayesResult(priors, conds, raw_counts, scores, post)
+    return fit_model(df, target, attrs, alpha).evaluate(instance)
 # ---------------------------------------------------------------------------------
 
@@ -15,16 +15,29 @@ from pathlib import Path
 from typing import Dict, List, Optional
 from .utils import parse_bool
 
-# Clase principal que administra la carga, interpretación y validación del archivo de configuración
+# Claves de salida que, heredadas de la sección global, se distinguen por experimento
+# agregando el nombre del experimento (evita que varios experimentos escriban el mismo archivo)
+OUTPUT_KEYS = ("REPORT", "MODEL_OUT", "PREDICTIONS_OUT")
+
+# Clase principal que administra la carga, interpretación y validación del archivo de configuración.
+# Además de la configuración única de siempre, el archivo puede declarar experimentos con
+# nombre en secciones [nombre] (o [EXPERIMENT nombre]); las claves anteriores a la primera
+# sección son valores por defecto para todos los experimentos
 class Config:
-    def __init__(self, path: str):
+    def __init__(self, path: str, kv: Optional[Dict[str, str]] = None,
+                 instances: Optional[List[Dict[str, str]]] = None, name: Optional[str] = None):
         self.path = Path(path)
         if not self.path.exists():
             raise FileNotFoundError(f"No se encontró el archivo de entrada: {path}")
 
+        self.name = name # Nombre del experimento (None = configuración global)
         self.kv: Dict[str, str] = {}
         self.instances: List[Dict[str, str]] = []
-        self._parse()
+        self.sections: Dict[str, tuple] = {} # nombre -> (claves, instancias) de cada experimento
+        if kv is None:
+            self._parse()
+        else:
+            self.kv, self.instances = dict(kv), list(instances or [])
         self._validate_duplicates()
 
 
@@ -33,6 +46,7 @@ class Config:
         # Lee input.txt e interpreta pares clave=valor e instancias, con soporte para comentarios de bloque y línea.
         current_instance = None
         in_block_comment = False
+        kv, instances = self.kv, self.instances # Destino actual: global o sección en curso
 
         with self.path.open("r", encoding="utf-8") as f:
             for raw in f:
@@ -57,10 +71,25 @@ class Config:
                 if not line or line.startswith("#"):
                     continue
 
+                # Inicia una sección de experimento: [nombre] o [EXPERIMENT nombre]
+                if line.startswith("[") and line.endswith("]"):
+                    if current_instance:
+                        instances.append(current_instance)
+                    current_instance = None
+                    name = line[1:-1].strip()
+                    if name.upper().startswith("EXPERIMENT"):
+                        name = name[len("EXPERIMENT"):].strip(" :")
+                    name = name or f"experimento_{len(self.sections) + 1}"
+                    if name in self.sections:
+                        raise ValueError(f"[ERROR] El experimento '{name}' está definido más de una vez en {self.path.name}.")
+                    kv, instances = {}, []
+                    self.sections[name] = (kv, instances)
+                    continue
+
                 # Inicia bloque de instancia
                 if line.endswith(":") and line[:-1].strip().upper().startswith("INSTANCE"):
                     if current_instance is not None:
-                        self.instances.append(current_instance)
+                        instances.append(current_instance)
                     current_instance = {}
                     continue
 
@@ -76,28 +105,45 @@ class Config:
                     current_instance[k] = v
                 else:
                     # Si la clave ya existe, guarda múltiples valores como lista
-                    if k in self.kv:
-                        prev = self.kv[k]
+                    if k in kv:
+                        prev = kv[k]
                         if not isinstance(prev, list):
-                            self.kv[k] = [prev, v]
+                            kv[k] = [prev, v]
                         else:
-                            self.kv[k].append(v)
+                            kv[k].append(v)
                     else:
-                        self.kv[k] = v
+                        kv[k] = v
 
          # Agrega la última instancia encontrada (si existe)
         if current_instance:
-            self.instances.append(current_instance)
+            instances.append(current_instance)
+
+    # Experimentos declarados en secciones, cada uno como Config propio: claves globales
+    # más las de su sección (que tienen prioridad) y sus instancias (o las globales si no
+    # declara ninguna). Lista vacía si el archivo no tiene secciones
+    @property
+    def experiments(self) -> List[Config]:
+        out = []
+        for name, (kv, instances) in self.sections.items():
+            merged = {**self.kv, **kv}
+            for key in OUTPUT_KEYS:
+                if key in self.kv and key not in kv:
+                    v = merged[key][-1] if isinstance(merged[key], list) else merged[key]
+                    p = Path(v)
+                    merged[key] = str(p.with_name(f"{p.stem}_{name}{p.suffix}"))
+            out.append(Config(str(self.path), kv=merged, instances=instances or self.instances, name=name))
+        return out
 
     # Verifica duplicados en claves críticas
     def _validate_duplicates(self):
         """Verifica si hay claves críticas duplicadas como DATASET o TARGET_COLUMN."""
         critical = ("DATASET", "TARGET_COLUMN")
+        where = self.path.name if self.name is None else f"{self.path.name} [{self.name}]"
         for key in critical:
             val = self.kv.get(key)
             if isinstance(val, list):
                 msg = (
-                    f"[ERROR] Se detectaron múltiples definiciones de '{key}' en {self.path.name}:\n"
+                    f"[ERROR] Se detectaron múltiples definiciones de '{key}' en {where}:\n"
                     f"         {val}\n"
                     f"         Mantén solo una definición válida."
                 )
@@ -143,6 +189,14 @@ class Config:
     def use_all_attributes(self) -> bool:
         return parse_bool(self.kv.get("USE_ALL_ATTRIBUTES", "true"))
 
+    # Recorta la tabla en la primera fila/columna vacía (descarta notas o totales al final)
+    @property
+    def trim_trailing(self) -> bool:
+        v = self.kv.get("TRIM_TRAILING", "false")
+        if isinstance(v, list):
+            v = v[-1]
+        return parse_bool(v)
+
     # Lista explícita de atributos seleccionados
     @property
     def attributes(self) -> Optional[List[str]]:
@@ -172,6 +226,45 @@ class Config:
             v = v[-1]
         return v
 
+    # Modo del reporte: "separate" (un PDF por instancia) o "combined" (un solo PDF)
+    @property
+    def report_mode(self) -> str:
+        v = self.kv.get("REPORT_MODE", "separate")
+        if isinstance(v, list):
+            v = v[-1]
+        return v.strip().lower()
+
+    # Número máximo de compilaciones de LaTeX simultáneas (None = núcleos disponibles)
+    @property
+    def report_workers(self) -> Optional[int]:
+        try:
+            v = self.kv.get("REPORT_WORKERS")
+            if isinstance(v, list):
+                v = v[-1]
+            return max(1, int(v)) if v else None
+        except Exception:
+            return None
+
+    # Valores más probables por clase que se muestran en cada tabla de verosimilitudes
+    # (None = tabla completa); el resto se resume en una columna "otros"
+    @property
+    def report_top_k(self) -> Optional[int]:
+        try:
+            v = self.kv.get("REPORT_TOP_K")
+            if isinstance(v, list):
+                v = v[-1]
+            return int(v) if v and int(v) > 0 else None
+        except Exception:
+            return None
+
+    # Exporta las tablas de verosimilitudes completas a un CSV junto al reporte
+    @property
+    def report_tables_csv(self) -> bool:
+        v = self.kv.get("REPORT_TABLES_CSV", "false")
+        if isinstance(v, list):
+            v = v[-1]
+        return parse_bool(v)
+
     # Modo de tratamiento de variables numéricas
     @property
     def numeric_mode(self) -> str:
@@ -198,5 +291,157 @@ class Config:
         if isinstance(v, list):
             v = v[-1]
         return v
+
+    # Directorio del caché de snapshots de hojas de cálculo (None si CACHE=false)
+    @property
+    def cache_dir(self) -> Optional[str]:
+        enabled = self.kv.get("CACHE", "true")
+        if isinstance(enabled, list):
+            enabled = enabled[-1]
+        if not parse_bool(enabled):
+            return None
+        v = self.kv.get("CACHE_DIR", ".cache/snapshots")
+        if isinstance(v, list):
+            v = v[-1]
+        return v
+
+    # Tamaño máximo del caché de snapshots en MB
+    @property
+    def cache_max_mb(self) -> float:
+        try:
+            v = self.kv.get("CACHE_MAX_MB", "256")
+            if isinstance(v, list):
+                v = v[-1]
+            return float(v)
+        except Exception:
+            return 256.0
+
+    # Número de procesos para el ajuste del modelo (1 = serial)
+    @property
+    def workers(self) -> int:
+        try:
+            v = self.kv.get("WORKERS", "1")
+            if isinstance(v, list):
+                v = v[-1]
+            return max(1, int(v))
+        except Exception:
+            return 1
+
+    # Tamaño de bloque (filas) para leer CSV grandes por partes; None = lectura completa
+    @property
+    def chunksize(self) -> Optional[int]:
+        try:
+            v = self.kv.get("CHUNKSIZE")
+            if isinstance(v, list):
+                v = v[-1]
+            return int(v) if v and int(v) > 0 else None
+        except Exception:
+            return None
+
+    # Ruta (directorio) donde se guarda el modelo ajustado
+    @property
+    def model_out(self) -> Optional[str]:
+        v = self.kv.get("MODEL_OUT")
+        if isinstance(v, list):
+            v = v[-1]
+        return v
+
+    # Ruta (directorio) de un modelo guardado; si existe, no se lee el dataset
+    @property
+    def model_in(self) -> Optional[str]:
+        v = self.kv.get("MODEL_IN")
+        if isinstance(v, list):
+            v = v[-1]
+        return v
+
+    # Archivo CSV/Parquet con instancias a clasificar en lote (además de los bloques INSTANCE)
+    @property
+    def instances_file(self) -> Optional[str]:
+        v = self.kv.get("INSTANCES_FILE")
+        if isinstance(v, list):
+            v = v[-1]
+        return v
+
+    # Archivo de salida de las predicciones de INSTANCES_FILE (CSV o Parquet);
+    # por defecto <instancias>_predicciones.csv junto al archivo de instancias
+    @property
+    def predictions_out(self) -> Optional[str]:
+        v = self.kv.get("PREDICTIONS_OUT")
+        if isinstance(v, list):
+            v = v[-1]
+        if not v and self.instances_file:
+            src = Path(self.instances_file)
+            suffix = f"_{self.name}" if self.name else ""
+            v = str(src.with_name(f"{src.stem}_predicciones{suffix}.csv"))
+        return v
+
+    # Filas por bloque al leer INSTANCES_FILE
+    @property
+    def instances_chunksize(self) -> int:
+        try:
+            v = self.kv.get("INSTANCES_CHUNKSIZE", "50000")
+            if isinstance(v, list):
+                v = v[-1]
+            return max(1, int(v))
+        except Exception:
+            return 50000
+
+    # Genera también un reporte por cada instancia de INSTANCES_FILE (requiere REPORT)
+    @property
+    def instances_report(self) -> bool:
+        v = self.kv.get("INSTANCES_REPORT", "false")
+        if isinstance(v, list):
+            v = v[-1]
+        return parse_bool(v)
+
+    # Valores de alpha a comparar sobre INSTANCES_FILE (ej. ALPHA_SWEEP=0,0.5,1,2)
+    @property
+    def alpha_sweep(self) -> List[float]:
+        v = self.kv.get("ALPHA_SWEEP", "")
+        if isinstance(v, list):
+            v = v[-1]
+        out = []
+        for part in str(v).split(","):
+            try:
+                if part.strip():
+                    out.append(float(part))
+            except ValueError:
+                print(f"[WARN] Valor de ALPHA_SWEEP no numérico, se ignora: {part.strip()}")
+        return out
+
+    # Experimentos ejecutados a la vez (None = núcleos disponibles)
+    @property
+    def experiment_workers(self) -> Optional[int]:
+        try:
+            v = self.kv.get("EXPERIMENT_WORKERS")
+            if isinstance(v, list):
+                v = v[-1]
+            return max(1, int(v)) if v else None
+        except Exception:
+            return None
+
+    # Instrumentación por etapas (tiempo, CPU y memoria) con traza JSON
+    @property
+    def profile(self) -> bool:
+        v = self.kv.get("PROFILE", "false")
+        if isinstance(v, list):
+            v = v[-1]
+        return parse_bool(v)
+
+    # Ruta de la traza JSON de PROFILE
+    @property
+    def profile_out(self) -> str:
+        v = self.kv.get("PROFILE_OUT", "profile.json")
+        if isinstance(v, list):
+            v = v[-1]
+        return v
+
+    # Directorio para volcados de cProfile (.prof) por etapa; None = sin cProfile
+    @property
+    def profile_cprofile(self) -> Optional[str]:
+        v = self.kv.get("PROFILE_CPROFILE")
+        if isinstance(v, list):
+            v = v[-1]
+        return v
 # ---------------------------------------------------------------------------------
 
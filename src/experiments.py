@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+src/experiments.py
+ ------------------------------------------------------------
+ Descripción:
+
+Ejecución de varios experimentos con nombre declarados en un mismo archivo
+de configuración (secciones [nombre]).
+
+  - Los experimentos se agrupan por (DATASET, SHEET): cada dataset se carga y
+    codifica una sola vez.
+  - Los experimentos que solo difieren en LAPLACE_ALPHA o en el subconjunto de
+    atributos comparten las tablas de conteo: se ajusta un modelo base con la
+    unión de sus atributos y cada uno toma su parte con NaiveBayesModel.subset.
+  - Los experimentos se ejecutan a la vez en un pool de hilos; la salida de
+    cada uno se muestra completa, en el orden del archivo.
+"""
+
+from __future__ import annotations
+import io
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+from .config import Config
+from .loader import load_dataset
+from .preprocess import discretize, numeric_attributes
+from .bayes import fit_model
+from .main import build_model, run_instances, select_columns
+from .profiling import bind, stage
+
+# Redirige print() a un búfer por hilo para que la salida de experimentos concurrentes
+# no se mezcle; fuera de un experimento escribe directo en la salida original
+class _ThreadOutput(io.TextIOBase):
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self.local, "buffer", None)
+        return (buffer if buffer is not None else self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+# Clave de preprocesamiento: experimentos con la misma clave pueden compartir conteos
+def _fit_key(cfg: Config, target: str) -> tuple:
+    if cfg.numeric_mode == "discretize":
+        return (target, "discretize", cfg.bins, cfg.discretize_strategy)
+    return (target, cfg.numeric_mode if cfg.numeric_mode == "gaussian" else "raw")
+
+# Ajusta el modelo base de un grupo de experimentos con la unión de sus atributos.
+# alpha no afecta los conteos, así que el base se ajusta con 0 y cada experimento fija el suyo
+def _fit_base(df, key: tuple, attrs: List[str], workers: int):
+    target, mode = key[0], key[1]
+    edges, numeric = {}, []
+    if mode == "discretize":
+        df, edges = discretize(df, attrs, bins=key[2], strategy=key[3])
+    elif mode == "gaussian":
+        df, numeric = numeric_attributes(df, attrs)
+    model = fit_model(df, target, attrs, alpha=0.0, edges=edges, numeric_attrs=numeric, workers=workers)
+    return model, df
+
+# DataFrame para la vista previa del reporte de un experimento: las columnas
+# preprocesadas que no usa el experimento vuelven a sus valores originales
+def _report_frame(raw, prepared, attrs: List[str], union: List[str]):
+    if prepared is raw:
+        return raw
+    restore = [c for c in union if c not in attrs]
+    if not restore:
+        return prepared
+    out = prepared.copy(deep=False)
+    for c in restore:
+        out[c] = raw[c]
+    return out
+
+# Ejecuta los experimentos y devuelve todos los .tex pendientes de compilar
+def run_experiments(experiments: List[Config], workers: int | None = None) -> List[Path]:
+    workers = max(1, min(workers or os.cpu_count() or 1, len(experiments)))
+    print(f"[OK] {len(experiments)} experimentos: {', '.join(c.name for c in experiments)}")
+
+    # Con MODEL_IN o lectura por bloques cada experimento obtiene su propio modelo
+    def independent(cfg: Config) -> bool:
+        return bool(cfg.model_in) or bool(cfg.chunksize and cfg.dataset.lower().endswith(".csv"))
+
+    groups: Dict[tuple, List[Config]] = {}
+    for cfg in experiments:
+        if not independent(cfg):
+            groups.setdefault((cfg.dataset, cfg.sheet, cfg.trim_trailing), []).append(cfg)
+
+    plans: Dict[str, tuple] = {} # nombre -> (clave de modelo base, attrs, target, normalized_cols)
+    errors: Dict[str, Exception] = {}
+    bases: Dict[tuple, tuple] = {} # clave -> (modelo base, df preprocesado, dataset crudo, unión de attrs)
+
+    # Ejecuta fn(key) y devuelve (resultado, None) o (None, excepción): un grupo con
+    # error no interrumpe a los demás
+    def attempt(fn):
+        def run(key):
+            try:
+                return fn(key), None
+            except Exception as e:
+                return None, e
+        return run
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # 1) Una carga por dataset (datasets distintos en paralelo)
+        keys = list(groups)
+        def load(key):
+            cfg = groups[key][0]
+            return load_dataset(cfg.dataset, cfg.sheet, trim_trailing=cfg.trim_trailing,
+                                cache_dir=cfg.cache_dir, cache_max_mb=cfg.cache_max_mb)
+        frames = {}
+        with stage("load_datasets"):
+            loaded = list(pool.map(bind(attempt(load)), keys))
+        for key, (df, error) in zip(keys, loaded):
+            names = ", ".join(c.name for c in groups[key])
+            if error is not None:
+                print(f"[ERROR] No se pudo cargar {key[0]} -> {names}: {error}")
+                for cfg in groups[key]:
+                    errors[cfg.name] = error
+                continue
+            frames[key] = df
+            print(f"[OK] Dataset cargado una vez: {key[0]}" + (f" ({key[1]})" if key[1] else "") + f" -> {names}")
+
+        # 2) Un modelo base por dataset y preprocesamiento, con la unión de atributos
+        unions: Dict[tuple, List[str]] = {}
+        for key, cfgs in groups.items():
+            if key not in frames:
+                continue
+            for cfg in cfgs:
+                try:
+                    attrs, target, normalized_cols = select_columns(frames[key], cfg)
+                except ValueError as e:
+                    errors[cfg.name] = e
+                    continue
+                base_key = (key, *_fit_key(cfg, target))
+                union = unions.setdefault(base_key, [])
+                union.extend(a for a in attrs if a not in union)
+                plans[cfg.name] = (base_key, attrs, target, normalized_cols)
+
+        base_keys = list(unions)
+        def fit(base_key):
+            raw = frames[base_key[0]]
+            # Los atributos siguen el orden de las columnas del dataset
+            union = [c for c in raw.columns if c in unions[base_key]]
+            model, prepared = _fit_base(raw, base_key[1:], union,
+                                        max(c.workers for c in groups[base_key[0]]))
+            return model, prepared, raw, union
+        with stage("fit_base_models"):
+            fitted = list(pool.map(bind(attempt(fit)), base_keys))
+        for base_key, (base, error) in zip(base_keys, fitted):
+            if error is None:
+                bases[base_key] = base
+                continue
+            # Todos los experimentos que comparten este modelo base quedan con el error
+            names = [n for n, plan in plans.items() if plan[0] == base_key]
+            print(f"[ERROR] No se pudo ajustar el modelo base de {', '.join(names)}: {error}")
+            for name in names:
+                errors[name] = error
+                del plans[name]
+        shared = len(plans) - len(bases)
+        print(f"[OK] Modelos base ajustados: {len(bases)} para {len(plans)} experimentos"
+              + (f" ({shared} comparten conteos)" if shared > 0 else ""))
+
+        # 3) Experimentos concurrentes; la salida de cada uno se guarda y se muestra en orden
+        out = _ThreadOutput(sys.stdout)
+        def run(cfg: Config):
+            out.local.buffer = io.StringIO()
+            try:
+                with stage(f"experiment[{cfg.name}]"):
+                    if cfg.name in errors:
+                        raise errors[cfg.name]
+                    if cfg.name in plans:
+                        base_key, attrs, target, normalized_cols = plans[cfg.name]
+                        base, prepared, raw, union = bases[base_key]
+                        model = base.subset(attrs, cfg.laplace_alpha)
+                        df = _report_frame(raw, prepared, attrs, union)
+                    else:
+                        model, df, attrs, target, normalized_cols = build_model(cfg)
+                    # Solo columnas del experimento: los atributos de las instancias (a menudo
+                    # heredadas de la sección global) que quedan fuera de su subconjunto se
+                    # avisan y se ignoran, como las columnas extra de INSTANCES_FILE
+                    normalized_cols = {k: c for k, c in normalized_cols.items() if c in attrs or c == target}
+                    tex_paths = run_instances(cfg, model, df, attrs, target, normalized_cols)
+            except Exception as e: # Un experimento con error no detiene a los demás
+                print(f"[ERROR] Experimento '{cfg.name}': {e}")
+                tex_paths = []
+            finally:
+                text, out.local.buffer = out.local.buffer.getvalue(), None
+            return text, tex_paths
+
+        previous, sys.stdout = sys.stdout, out
+        try:
+            all_tex = []
+            with stage("run_experiments"):
+                for cfg, (text, tex_paths) in zip(experiments, pool.map(bind(run), experiments)):
+                    previous.write(f"\n########## EXPERIMENTO: {cfg.name} ##########\n{text}")
+                    all_tex.extend(tex_paths)
+        finally:
+            sys.stdout = previous
+    return all_tex
+# ---------------------------------------------------------------------------------
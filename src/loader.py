@@ -15,59 +15,137 @@ from __future__ import annotations
 from pathlib import Path
 import pandas as pd
 import numpy as np
-
-#Detecta automáticamente el bloque de datos (elimina filas/columnas vacías iniciales) y ajusta el encabezado a la primera fila no vacía.
-def _detect_table(df: pd.DataFrame) -> pd.DataFrame:
-    # Elimina columnas completamente vacías
-    df = df.dropna(axis=1, how="all")
-
-    # Encuentra la primera fila con al menos un valor no nulo
-    first_valid_row = None
-    for i, row in df.iterrows():
-        if row.notna().any():
-            first_valid_row = i
-            break
-
-    if first_valid_row is None:
+from .snapshot import snapshot_key, read_snapshot, write_snapshot
+from .profiling import stage
+
+# Convierte una columna a categórica de texto: la conversión a str se hace solo sobre
+# los valores únicos y las filas quedan como códigos enteros pequeños
+def _to_categorical(values: pd.Series) -> pd.Categorical:
+    codes, uniques = pd.factorize(values)
+    label_codes, labels = pd.factorize(np.array([str(u) for u in uniques], dtype=object))
+    if len(label_codes):
+        codes = np.where(codes >= 0, label_codes[codes], -1)
+    return pd.Categorical.from_codes(codes, categories=pd.Index(labels, dtype=object))
+
+# Construye un DataFrame de columnas categóricas (admite nombres repetidos)
+def _categorical_frame(table: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    out = pd.DataFrame({i: _to_categorical(table.iloc[:, i]) for i in range(table.shape[1])})
+    out.columns = columns
+    return out
+
+# Detecta automáticamente el bloque de datos con operaciones vectorizadas sobre la máscara
+# de celdas no vacías: la primera fila no vacía es el encabezado, se descartan filas y
+# columnas vacías y la conversión a texto (categórica) se hace una sola vez, solo sobre la región útil.
+# Con trim_trailing=True la tabla termina en la primera fila vacía después del encabezado
+# y en la primera columna vacía a la derecha, descartando bloques sueltos (notas, totales).
+def _detect_table(df: pd.DataFrame, trim_trailing: bool = False) -> pd.DataFrame:
+    mask = df.notna().to_numpy()
+    row_has_data = mask.any(axis=1)
+    if not row_has_data.any():
         raise ValueError("No se detectaron datos válidos en el archivo.")
 
-    # Usa esa fila como encabezado y recorta las filas anteriores
-    new_header = df.iloc[first_valid_row].astype(str)
-    df = df.iloc[first_valid_row + 1:].copy()
-    df.columns = new_header
+    # Primera y última fila con datos
+    first = int(np.argmax(row_has_data))
+    last = len(row_has_data) - int(np.argmax(row_has_data[::-1]))
+
+    if trim_trailing:
+        # Fin del bloque: primera fila vacía después del encabezado
+        gaps = np.flatnonzero(~row_has_data[first:last])
+        if len(gaps):
+            last = first + int(gaps[0])
+        col_has_data = mask[first:last].any(axis=0)
+        left = int(np.argmax(col_has_data))
+        gaps = np.flatnonzero(~col_has_data[left:])
+        right = left + int(gaps[0]) if len(gaps) else len(col_has_data)
+        cols = np.arange(left, right)
+    else:
+        cols = np.flatnonzero(mask.any(axis=0))
 
-    # Elimina filas completamente vacías restantes
-    df = df.dropna(how="all")
+    # Filas de datos (sin el encabezado ni filas vacías intermedias)
+    rows = first + 1 + np.flatnonzero(row_has_data[first + 1:last])
 
-    # Convierte todas las columnas a string por consistencia
-    df.columns = [str(c).strip() for c in df.columns]
-    df = df.astype(str)
+    header = [str(h).strip() for h in df.iloc[first, cols]]
+    with stage("to_categorical"):
+        return _categorical_frame(df.iloc[rows, cols], header)
 
-    return df.reset_index(drop=True)
+# Lee un CSV grande por bloques de tamaño fijo con memoria acotada. El encabezado se
+# detecta en la primera fila no vacía (aunque caiga en un bloque posterior) y cada
+# bloque se entrega ya recortado y en columnas categóricas, listo para el conteo incremental.
+# Nota: sin ver el archivo completo no se sabe si una columna está vacía en todas las
+# filas, así que solo se descartan las columnas sin nombre en el encabezado.
+def iter_csv_chunks(path: str, chunksize: int):
+    p = Path(path)
+    if not p.exists():
+        raise FileNotFoundError(f"Dataset no encontrado: {path}")
+    if p.suffix.lower() != ".csv":
+        raise ValueError(f"La lectura por bloques solo admite CSV: {path}")
+
+    keep, columns = None, None
+    reader = pd.read_csv(p, encoding="utf-8", header=None, dtype=str, chunksize=chunksize)
+    for chunk in reader:
+        if columns is None:
+            # Busca la primera fila no vacía del bloque para usarla como encabezado
+            non_empty = np.flatnonzero(chunk.notna().any(axis=1).to_numpy())
+            if len(non_empty) == 0:
+                continue
+            header = chunk.iloc[non_empty[0]]
+            keep = [i for i, h in enumerate(header) if pd.notna(h)]
+            columns = [str(header.iloc[i]).strip() for i in keep]
+            chunk = chunk.iloc[non_empty[0] + 1:]
+
+        chunk = chunk.iloc[:, keep].dropna(how="all")
+        if chunk.empty:
+            continue
+        yield _categorical_frame(chunk, columns)
+
+    if columns is None:
+        raise ValueError("No se detectaron datos válidos en el archivo.")
 
 # Carga un dataset desde un archivo CSV, XLSX o ODS, detectando automáticamente la región de la tabla (sin importar posición).
-def load_dataset(path: str, sheet: str | None = None) -> pd.DataFrame:
+# Para hojas de cálculo, si se indica cache_dir la tabla detectada se guarda como
+# snapshot columnar y las siguientes cargas del mismo archivo sin cambios no usan el parser.
+def load_dataset(path: str, sheet: str | None = None, trim_trailing: bool = False,
+                 cache_dir: str | None = None, cache_max_mb: float | None = None) -> pd.DataFrame:
     p = Path(path)
     if not p.exists():
         raise FileNotFoundError(f"Dataset no encontrado: {path}")
 
     ext = p.suffix.lower()
 
+    # --- Snapshot en caché (solo hojas de cálculo) ---
+    use_cache = cache_dir is not None and ext in {".xlsx", ".xls", ".ods"}
+    if use_cache:
+        key = snapshot_key(path, sheet, trim_trailing)
+        with stage("read_snapshot"):
+            df = read_snapshot(cache_dir, key)
+        if df is not None:
+            return df
+
     # --- Carga según tipo de archivo ---
-    if ext == ".csv":
-        df = pd.read_csv(p, encoding="utf-8", header=None)
+    with stage(f"parse_{ext[1:]}"):
+        if ext == ".csv":
+            df = pd.read_csv(p, encoding="utf-8", header=None)
 
-    elif ext in {".xlsx", ".xls"}:
-        df = pd.read_excel(p, sheet_name=sheet or 0, engine="openpyxl", header=None)
+        elif ext in {".xlsx", ".xls"}:
+            df = pd.read_excel(p, sheet_name=sheet or 0, engine="openpyxl", header=None)
 
-    elif ext == ".ods":
-        df = pd.read_excel(p, sheet_name=sheet or 0, engine="odf", header=None)
+        elif ext == ".ods":
+            df = pd.read_excel(p, sheet_name=sheet or 0, engine="odf", header=None)
 
-    else:
-        raise ValueError(f"Formato no soportado: {ext}")
+        else:
+            raise ValueError(f"Formato no soportado: {ext}")
 
     # --- Detección automática del bloque de datos ---
-    df = _detect_table(df)
+    with stage("detect_table"):
+        df = _detect_table(df, trim_trailing=trim_trailing)
+
+    if use_cache:
+        max_bytes = int(cache_max_mb * 1024 * 1024) if cache_max_mb else None
+        try:
+            with stage("write_snapshot"):
+                write_snapshot(cache_dir, key, df, path, sheet, trim_trailing, max_bytes=max_bytes)
+        except OSError as e:
+            print(f"[WARN] No se pudo guardar el snapshot del dataset en caché: {e}")
     return df
 # ---------------------------------------------------------------------------------
 
@@ -10,13 +10,17 @@ Programa principal que ejecuta el flujo completo del clasificador Naive Bayes
 """
 
 from __future__ import annotations
-import sys
+import argparse
 import unicodedata
+from typing import Dict
+from . import profiling
 from .config import Config
-from .loader import load_dataset
-from .preprocess import discretize
-from .bayes import run_naive_bayes
-from .report_latex import render_pdf
+from .model_store import load_model, save_model
+from .profiling import stage
+
+# Los módulos pesados (pandas a través de loader/preprocess y el generador LaTeX) se
+# importan dentro de las ramas que los usan: puntuar con un modelo guardado y sin
+# reporte no carga pandas
 
 # Normaliza cadenas para comparación (quita tildes, minúsculas, sin espacios extra).
 def normalize_str(s: str) -> str:
@@ -54,54 +58,236 @@ def select_columns(df, cfg):
 
     return attrs, target, normalized_cols
 
-# Función principal: controla la ejecución del programa
-def main():
-    # Verificación de argumentos del programa
-    if len(sys.argv) != 2:
-        print("Uso: python -m src.main input.txt")
-        sys.exit(1)
+# Obtiene el modelo según la configuración: lo carga de MODEL_IN, lo ajusta por bloques
+# (CHUNKSIZE con CSV) o lo ajusta sobre el dataset completo. Devuelve el modelo, el
+# DataFrame usado para la vista previa (None si se cargó de disco), los atributos, la
+# clase objetivo y el mapa de nombres normalizados -> columnas
+def build_model(cfg: Config):
+    if cfg.model_in:
+        # Modelo guardado: no se lee ni se reajusta el dataset
+        with stage("load_model"):
+            model = load_model(cfg.model_in)
+        df = None
+        attrs, target = model.attrs, model.target
+        normalized_cols = {normalize_str(c): c for c in [*attrs, target]}
+        print(f"[OK] Modelo cargado: {cfg.model_in}")
+        return model, df, attrs, target, normalized_cols
 
-    # Carga y preparación del archivo de configuración
-    cfg = Config(sys.argv[1]) # Carga del dataset
-    df = load_dataset(cfg.dataset, cfg.sheet) # Conversión a texto
-    df = df.astype(str)
+    from .loader import load_dataset, iter_csv_chunks
+    from .preprocess import discretize, numeric_attributes
+    from .bayes import fit_model
+    if cfg.chunksize and cfg.dataset.lower().endswith(".csv"):
+        # CSV por bloques: cada bloque se suma al modelo y se descarta (memoria acotada).
+        # El primer bloque define las columnas y sirve como vista previa del reporte
+        chunks = iter_csv_chunks(cfg.dataset, cfg.chunksize)
+        with stage("first_chunk"):
+            df = next(chunks, None)
+        if df is None:
+            raise ValueError("El dataset no contiene filas de datos.")
+        attrs, target, normalized_cols = select_columns(df, cfg)
+
+        numeric = []
+        if cfg.numeric_mode == "discretize":
+            print("[WARN] NUMERIC_MODE=discretize no está disponible con CHUNKSIZE; se usan valores crudos.")
+        elif cfg.numeric_mode == "gaussian":
+            # Los estadísticos gaussianos se combinan bloque a bloque
+            df, numeric = numeric_attributes(df, attrs)
+
+        with stage("fit_model"):
+            model = fit_model(df, target, attrs, alpha=cfg.laplace_alpha, numeric_attrs=numeric)
+        with stage("partial_fit_chunks"):
+            for chunk in chunks:
+                model.partial_fit(chunk)
+        print(f"[OK] Dataset procesado por bloques: {model.n_rows} filas")
+    else:
+        # Carga del dataset (ya en texto), usando el snapshot en caché si el archivo no cambió
+        with stage("load_dataset"):
+            df = load_dataset(cfg.dataset, cfg.sheet, trim_trailing=cfg.trim_trailing,
+                              cache_dir=cfg.cache_dir, cache_max_mb=cfg.cache_max_mb)
+
+        # Selección de atributos y clase objetivo
+        attrs, target, normalized_cols = select_columns(df, cfg)
 
-    # Selección de atributos y clase objetivo
-    attrs, target, normalized_cols = select_columns(df, cfg)
+        # Atributos numéricos: discretización (los bordes se guardan en el modelo)
+        # o verosimilitud gaussiana por clase
+        edges, numeric = {}, []
+        if cfg.numeric_mode == "discretize":
+            with stage("discretize"):
+                df, edges = discretize(df, attrs, bins=cfg.bins, strategy=cfg.discretize_strategy)
+            if edges:
+                print(f"[OK] Atributos discretizados: {', '.join(edges)}")
+        elif cfg.numeric_mode == "gaussian":
+            with stage("numeric_attributes"):
+                df, numeric = numeric_attributes(df, attrs)
+            if numeric:
+                print(f"[OK] Atributos gaussianos: {', '.join(numeric)}")
 
-    # Normalizar valores de instancia según columnas reales
-    if cfg.numeric_mode == "discretize":
-        df = discretize(df, attrs, bins=cfg.bins, strategy=cfg.discretize_strategy)
+        # Ajuste del modelo una sola vez; se reutiliza para todas las instancias
+        with stage("fit_model"):
+            model = fit_model(df, target, attrs, alpha=cfg.laplace_alpha, edges=edges,
+                              numeric_attrs=numeric, workers=cfg.workers)
+
+    return model, df, attrs, target, normalized_cols
+
+# Normaliza los nombres de atributos de una instancia a las columnas del dataset;
+# devuelve la instancia normalizada y los nombres que no corresponden a ninguna columna
+def normalize_instance(inst: Dict[str, str], normalized_cols: Dict[str, str]):
+    inst_norm, unknown = {}, []
+    for k, v in inst.items():
+        nk = normalize_str(k)
+        if nk in normalized_cols:
+            inst_norm[normalized_cols[nk]] = v
+        else:
+            unknown.append(k)
+    return inst_norm, unknown
+
+# Ejecuta una configuración con el modelo ya obtenido: guarda el modelo si se pidió,
+# evalúa las instancias (bloques INSTANCE e INSTANCES_FILE) y genera los .tex de los
+# reportes. Devuelve la lista de .tex pendientes de compilar
+def run_instances(cfg: Config, model, df, attrs, target, normalized_cols) -> list:
+    # Guarda el modelo ajustado si se configuró MODEL_OUT
+    if cfg.model_out:
+        with stage("save_model"):
+            save_model(model, cfg.model_out)
+        print(f"[OK] Modelo guardado: {cfg.model_out}")
+
+    if cfg.report_path:
+        from .report_latex import write_tex, write_combined_tex, write_tables_csv
+
+    tex_paths = [] # Reportes pendientes de compilar
+    combined = cfg.report_mode == "combined"
+    results = [] # (número, instancia, posteriores) para el reporte combinado
+
+    # Reporte de una instancia ya evaluada: en modo combinado se acumula para el final;
+    # si no, se genera su .tex (se compila al final)
+    def add_report(idx, inst_norm, posteriors):
+        if combined:
+            results.append((idx, inst_norm, posteriors))
+            return
+        out = cfg.report_path.replace(".pdf", f"_{idx}.pdf")
+        with stage(f"write_tex[{idx}]"):
+            tex_paths.append(write_tex(out, df, target, attrs, model.priors, model.cond_tables,
+                                       inst_norm, posteriors, model.raw_counts, total_rows=model.n_rows,
+                                       gaussian=model.gaussian_tables, fingerprint=model.fingerprint(),
+                                       top_k=cfg.report_top_k))
+        print(f"[OK] Reporte: {out}")
 
     for idx, inst in enumerate(cfg.instances, 1):
         # Normaliza nombres de atributos de la instancia
-        inst_norm = {}
-        for k, v in inst.items():
-            nk = normalize_str(k)
-            if nk in normalized_cols:
-                inst_norm[normalized_cols[nk]] = v
-            else:
-                print(f"[WARN] Atributo '{k}' no encontrado en las columnas del dataset, se ignora.")
+        inst_norm, unknown = normalize_instance(inst, normalized_cols)
+        for k in unknown:
+            print(f"[WARN] Atributo '{k}' no encontrado en las columnas del dataset, se ignora.")
 
         print(f"\n===== INSTANCIA {idx}: {inst_norm} =====")
 
-        # Ejecución del clasificador Naive Bayes para la instancia
+        # Valores numéricos -> intervalos del modelo (mismos bordes que en el ajuste)
+        inst_norm = model.prepare_instance(inst_norm)
+
+        # Evaluación de la instancia con el modelo ya ajustado (las tablas del reporte
+        # se toman del modelo solo si hay que generarlo)
         try:
-            res = run_naive_bayes(df, target, attrs, inst_norm, alpha=cfg.laplace_alpha)
+            with stage(f"score[{idx}]"):
+                _, posteriors, _ = model.score(inst_norm)
         except KeyError as e:
             print(f"[ERROR] Atributo faltante o incorrecto: {e}")
             continue
 
         # Obtención de la predicción con mayor probabilidad
-        pred = max(res.posteriors, key=res.posteriors.get)
+        pred = max(posteriors, key=posteriors.get)
         print(f">>> Predicción: {pred}")
 
-        # Generación del reporte PDF si la ruta está configurada
+        # Generación del .tex del reporte si la ruta está configurada (se compila al final)
         if cfg.report_path:
-            out = cfg.report_path.replace(".pdf", f"_{idx}.pdf")
-            render_pdf(out, df, target, attrs, res.priors, res.cond_tables, inst_norm, res.posteriors, res.raw_counts)
+            add_report(idx, inst_norm, posteriors)
+
+    # Instancias desde archivo: evaluación por bloques con predict_batch y salida a archivo.
+    # Reportes por instancia solo con INSTANCES_REPORT=true
+    if cfg.instances_file:
+        from .predictions import predict_file
+        offset = len(cfg.instances)
+        on_row = None
+        if cfg.report_path and cfg.instances_report:
+            on_row = lambda n, inst, post: add_report(offset + n, inst, post)
+        with stage("instances_file"):
+            predict_file(model, cfg.instances_file, cfg.predictions_out, normalized_cols, normalize_str,
+                         chunksize=cfg.instances_chunksize, on_row=on_row)
+
+    # Barrido de LAPLACE_ALPHA sobre el archivo de instancias: las tablas de cada alpha se
+    # derivan de los conteos del modelo, sin reajustar
+    alphas = cfg.alpha_sweep
+    if alphas:
+        if cfg.instances_file:
+            from .predictions import sweep_file
+            with stage("alpha_sweep"):
+                sweep_file(model, cfg.instances_file, alphas, normalized_cols, normalize_str,
+                           chunksize=cfg.instances_chunksize)
+        else:
+            print("[WARN] ALPHA_SWEEP requiere INSTANCES_FILE (con la columna objetivo) como conjunto de evaluación.")
+
+    # Reporte combinado: secciones compartidas una sola vez y una sección por instancia
+    if cfg.report_path and combined and results:
+        with stage("write_combined_tex"):
+            tex_paths.append(write_combined_tex(cfg.report_path, df, target, attrs, model.priors,
+                                                model.cond_tables, results, model.raw_counts,
+                                                total_rows=model.n_rows, gaussian=model.gaussian_tables,
+                                                fingerprint=model.fingerprint(), top_k=cfg.report_top_k))
+        print(f"[OK] Reporte combinado: {cfg.report_path}")
+
+    # Tablas de verosimilitudes completas en CSV (el PDF puede mostrarlas recortadas)
+    if cfg.report_path and cfg.report_tables_csv:
+        with stage("write_tables_csv"):
+            csv_path = write_tables_csv(cfg.report_path.replace(".pdf", "_verosimilitudes.csv"), attrs,
+                                        model.cond_tables, model.raw_counts)
+        print(f"[OK] Tablas completas: {csv_path}")
+
+    return tex_paths
+
+# Función principal: controla la ejecución del programa
+def main():
+    # Argumentos del programa
+    parser = argparse.ArgumentParser(prog="python -m src.main",
+                                     description="Clasificador Naive Bayes con reporte LaTeX")
+    parser.add_argument("input", help="archivo de configuración (ej. input.txt)")
+    parser.add_argument("--force", action="store_true",
+                        help="recompila los PDF aunque el .tex no haya cambiado")
+    parser.add_argument("--profile", action="store_true",
+                        help="mide tiempo, CPU y memoria por etapa (igual que PROFILE=true)")
+    parser.add_argument("--profile-out", help="ruta de la traza JSON (por defecto PROFILE_OUT o profile.json)")
+    parser.add_argument("--cprofile", metavar="DIR", help="vuelca un perfil de cProfile por etapa en DIR")
+    args = parser.parse_args()
+
+    # Con --profile la medición empieza antes de leer la configuración
+    if args.profile:
+        profiling.start(args.cprofile)
+
+    # Carga y preparación del archivo de configuración
+    with stage("config"):
+        cfg = Config(args.input)
+    if not args.profile and cfg.profile:
+        profiling.start(args.cprofile or cfg.profile_cprofile)
+
+    experiments = cfg.experiments
+    if experiments:
+        # Varios experimentos: cada dataset se carga una vez y los conteos se comparten
+        from .experiments import run_experiments
+        tex_paths = run_experiments(experiments, workers=cfg.experiment_workers)
+    else:
+        with stage("build_model"):
+            model, df, attrs, target, normalized_cols = build_model(cfg)
+        tex_paths = run_instances(cfg, model, df, attrs, target, normalized_cols)
+
+    # Compilación concurrente de todos los reportes
+    if tex_paths:
+        from .report_latex import compile_all
+        with stage("compile_all"):
+            compile_all(tex_paths, workers=cfg.report_workers, force=args.force)
 
-            print(f"[OK] Reporte: {out}")
+    # Traza de la instrumentación por etapas
+    prof = profiling.stop()
+    if prof is not None:
+        trace_path = prof.write(args.profile_out or cfg.profile_out)
+        print("\n" + prof.summary())
+        print(f"[OK] Traza de perfil: {trace_path}")
 
     print("[OK] Ejecución completada. Si el .tex fue generado, puedes compilarlo con 'make latex'.")
 
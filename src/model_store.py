@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ src/model_store.py
+ ------------------------------------------------------------
+ Descripción:
+
+ Módulo encargado de guardar y cargar modelos Naive Bayes ya
+ ajustados. El modelo se almacena en un directorio con un
+ encabezado JSON versionado (clases, vocabularios, alpha) y un
+ archivo .npy por arreglo de conteos, bordes de discretización
+ o estadísticos gaussianos.
+ Al cargar, los arreglos se abren con memoria mapeada, por lo
+ que un proceso que solo clasifica arranca sin leer el dataset.
+
+ Cada guardado escribe los arreglos con nombres nuevos y reemplaza
+ el encabezado de forma atómica al final: un proceso que tiene
+ mapeado el modelo anterior (o MODEL_IN = MODEL_OUT) nunca ve
+ archivos a medio escribir.
+"""
+
+from __future__ import annotations
+import json
+import os
+import re
+import uuid
+from pathlib import Path
+import numpy as np
+from .bayes import NaiveBayesModel
+
+FORMAT_NAME = "bayes-nb"
+FORMAT_VERSION = 3 # v3: nombres de arreglos por generación (class_counts en el encabezado)
+HEADER_FILE = "header.json"
+ARRAY_FILE = re.compile(r"^(class_counts|counts_\d+|edges_\d+|gaussian_\d+)(\.\w+)?\.npy$")
+
+# Escribe un archivo completo con otro nombre y lo reemplaza de forma atómica
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(f".{path.name}.tmp{os.getpid()}")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+# Elimina los arreglos de guardados anteriores que el encabezado actual ya no usa. En
+# POSIX un proceso que aún los tiene mapeados conserva sus datos; si el sistema no
+# permite borrarlos (Windows), quedan para el siguiente guardado
+def _prune(out: Path, used: set):
+    for f in out.iterdir():
+        if ARRAY_FILE.match(f.name) and f.name not in used:
+            try:
+                f.unlink()
+            except OSError:
+                pass
+
+# Guarda el modelo en el directorio indicado (se crea si no existe). Los arreglos llevan
+# un sufijo de generación, así que nunca se sobrescribe un archivo que otro proceso (o
+# el propio modelo, si se cargó de este directorio) tenga mapeado en memoria
+def save_model(model: NaiveBayesModel, path: str) -> Path:
+    out = Path(path)
+    out.mkdir(parents=True, exist_ok=True)
+    gen = uuid.uuid4().hex[:12]
+
+    header = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "target": model.target,
+        "attrs": list(model.attrs),
+        "alpha": model.alpha,
+        "classes": list(model.classes),
+        "class_counts": f"class_counts.{gen}.npy",
+        "values": {a: list(model.values[a]) for a in model.categorical_attrs},
+        "counts": {},
+        "edges": {},
+        "gaussian": {},
+    }
+
+    np.save(out / header["class_counts"], np.asarray(model.class_counts, dtype=np.int64))
+    for i, attr in enumerate(model.attrs):
+        if attr in model.gaussian:
+            name = f"gaussian_{i:03d}.{gen}.npy"
+            np.save(out / name, np.asarray(model.gaussian[attr], dtype=float))
+            header["gaussian"][attr] = name
+        else:
+            name = f"counts_{i:03d}.{gen}.npy"
+            np.save(out / name, np.asarray(model.counts[attr], dtype=np.int64))
+            header["counts"][attr] = name
+        if attr in model.edges:
+            name = f"edges_{i:03d}.{gen}.npy"
+            np.save(out / name, np.asarray(model.edges[attr], dtype=float))
+            header["edges"][attr] = name
+
+    # El encabezado se reemplaza al final: hasta ese momento se sigue leyendo el modelo anterior
+    _write_atomic(out / HEADER_FILE, json.dumps(header, ensure_ascii=False, indent=1).encode("utf-8"))
+    _prune(out, {header["class_counts"], *header["counts"].values(), *header["edges"].values(),
+                 *header["gaussian"].values()})
+    return out
+
+# Carga un modelo guardado; los arreglos quedan mapeados en memoria (solo lectura)
+def load_model(path: str) -> NaiveBayesModel:
+    src = Path(path)
+    header_path = src / HEADER_FILE
+    if not header_path.exists():
+        raise FileNotFoundError(f"Modelo no encontrado: {path}")
+
+    header = json.loads(header_path.read_text(encoding="utf-8"))
+    if header.get("format") != FORMAT_NAME:
+        raise ValueError(f"El directorio {path} no contiene un modelo {FORMAT_NAME}.")
+    if header.get("version", 0) > FORMAT_VERSION:
+        raise ValueError(
+            f"Versión de modelo no soportada: {header.get('version')} "
+            f"(máxima soportada: {FORMAT_VERSION})"
+        )
+
+    attrs = header["attrs"]
+    counts = {a: np.load(src / name, mmap_mode="r") for a, name in header["counts"].items()}
+    edges = {a: np.load(src / name, mmap_mode="r") for a, name in header["edges"].items()}
+    gaussian = {a: np.load(src / name, mmap_mode="r") for a, name in header.get("gaussian", {}).items()}
+    return NaiveBayesModel(
+        target=header["target"],
+        attrs=attrs,
+        alpha=float(header["alpha"]),
+        classes=header["classes"],
+        class_counts=np.load(src / header.get("class_counts", "class_counts.npy"), mmap_mode="r"),
+        values=header["values"],
+        counts=counts,
+        edges=edges,
+        gaussian=gaussian,
+    )
+# ---------------------------------------------------------------------------------
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+src/predictions.py
+ ------------------------------------------------------------
+ Descripción:
+
+Clasificación masiva de instancias desde un archivo (INSTANCES_FILE).
+El archivo CSV o Parquet se lee por bloques, cada bloque se evalúa con
+predict_batch y las predicciones y posteriores se escriben en el archivo de
+salida a medida que se calculan (memoria acotada, sin reportes por instancia).
+
+Con ALPHA_SWEEP el mismo archivo (con la columna objetivo) sirve de conjunto de
+evaluación para comparar varios valores de alpha sin reajustar el modelo.
+
+Parquet requiere pyarrow (dependencia opcional).
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+from .bayes import NaiveBayesModel, predict_batch, sweep_alpha
+from .profiling import stage
+
+# Importa pyarrow solo para Parquet, con un mensaje claro si no está instalado
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Para leer o escribir Parquet instala pyarrow (pip install pyarrow).") from e
+    return pyarrow
+
+# Lee el archivo de instancias por bloques de `chunksize` filas. Los valores se
+# conservan como texto (como en input.txt); las celdas vacías quedan como NaN (ausentes)
+def iter_instances(path: str, chunksize: int = 50_000) -> Iterator[pd.DataFrame]:
+    p = Path(path)
+    if not p.exists():
+        raise FileNotFoundError(f"Archivo de instancias no encontrado: {path}")
+    ext = p.suffix.lower()
+    if ext == ".csv":
+        yield from pd.read_csv(p, encoding="utf-8", dtype=str, chunksize=chunksize)
+    elif ext in {".parquet", ".pq"}:
+        pa = _pyarrow()
+        for batch in pa.parquet.ParquetFile(p).iter_batches(batch_size=chunksize):
+            chunk = batch.to_pandas()
+            yield chunk.astype(object).where(chunk.notna(), np.nan)
+    else:
+        raise ValueError(f"Formato de instancias no soportado: {ext} (usa .csv o .parquet)")
+
+# Escribe las predicciones bloque a bloque en CSV o Parquet (según la extensión)
+class PredictionWriter:
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.parquet = self.path.suffix.lower() in {".parquet", ".pq"}
+        self._writer = None
+        self._started = False
+
+    def write(self, chunk: pd.DataFrame):
+        if self.parquet:
+            pa = _pyarrow()
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._writer is None:
+                self._writer = pa.parquet.ParquetWriter(str(self.path), table.schema)
+            self._writer.write_table(table)
+        else:
+            chunk.to_csv(self.path, mode="a" if self._started else "w", header=not self._started, index=False)
+        self._started = True
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+# Relaciona las columnas del archivo con los atributos del modelo usando los nombres
+# normalizados. Devuelve (columna -> atributo, columna de la clase o None, columnas ignoradas)
+def map_columns(columns: List[str], model: NaiveBayesModel, normalized_cols: Dict[str, str],
+                normalize: Callable[[str], str]):
+    mapping, target_col, ignored = {}, None, []
+    for col in columns:
+        name = normalized_cols.get(normalize(col))
+        if name in model.attrs:
+            mapping[col] = name
+        elif name == model.target:
+            target_col = col
+        else:
+            ignored.append(col)
+    return mapping, target_col, ignored
+
+# Clasifica todas las instancias del archivo y escribe, por fila, las columnas originales,
+# la clase predicha y la posterior de cada clase. Si el archivo trae la columna objetivo
+# se informa la exactitud. on_row(n, instancia, posteriores) permite generar reportes
+# por instancia (solo si se pidieron); la instancia llega ya traducida a los intervalos
+# del modelo, como en prepare_instance. Devuelve el número de instancias evaluadas
+def predict_file(model: NaiveBayesModel, path: str, out_path: str, normalized_cols: Dict[str, str],
+                 normalize: Callable[[str], str], chunksize: int = 50_000,
+                 on_row: Optional[Callable[[int, Dict[str, str], Dict[str, float]], None]] = None) -> int:
+    writer = PredictionWriter(out_path)
+    mapping, target_col, total, correct = None, None, 0, 0
+    try:
+        for n_chunk, chunk in enumerate(iter_instances(path, chunksize), 1):
+            if mapping is None:
+                mapping, target_col, ignored = map_columns(list(chunk.columns), model, normalized_cols, normalize)
+                if ignored:
+                    print(f"[WARN] Columnas no reconocidas en {path}, se ignoran: {', '.join(map(str, ignored))}")
+                if not mapping:
+                    raise ValueError(f"Ninguna columna de {path} corresponde a un atributo del modelo.")
+
+            with stage(f"predict_batch[{n_chunk}]"):
+                instances = chunk[list(mapping)].rename(columns=mapping)
+                result = predict_batch(model, instances)
+
+            out = chunk.copy()
+            out["prediccion"] = result.predictions
+            for j, c in enumerate(result.classes):
+                out[f"P({c})"] = result.posteriors[:, j]
+            with stage(f"write_predictions[{n_chunk}]"):
+                writer.write(out)
+
+            if target_col is not None:
+                correct += int((chunk[target_col].astype(str).to_numpy() == result.predictions.astype(str)).sum())
+            if on_row is not None:
+                # Los reportes muestran los mismos intervalos con los que se puntuó la fila
+                prepared = pd.DataFrame({a: model._prepare(a, instances[a]) for a in instances.columns})
+                records = prepared.to_dict("records")
+                for i, inst in enumerate(records):
+                    inst = {a: v for a, v in inst.items() if not pd.isna(v)}
+                    post = {c: float(p) for c, p in zip(result.classes, result.posteriors[i])}
+                    on_row(total + i + 1, inst, post)
+            total += len(chunk)
+    finally:
+        writer.close()
+
+    print(f"[OK] Instancias evaluadas desde {path}: {total} -> {out_path}")
+    if target_col is not None and total:
+        print(f"[OK] Exactitud sobre la columna '{target_col}': {correct / total:.4f} ({correct}/{total})")
+    return total
+
+# Evalúa el archivo de instancias con cada alpha de la lista (una pasada vectorizada por
+# bloque) y muestra la exactitud y la pérdida logarítmica de cada uno. El archivo debe
+# incluir la columna objetivo. Devuelve el alpha con mayor exactitud
+def sweep_file(model: NaiveBayesModel, path: str, alphas: List[float], normalized_cols: Dict[str, str],
+               normalize: Callable[[str], str], chunksize: int = 50_000) -> Optional[float]:
+    mapping, target_col, total = None, None, 0
+    correct, loss = np.zeros(len(alphas)), np.zeros(len(alphas))
+    for n_chunk, chunk in enumerate(iter_instances(path, chunksize), 1):
+        if mapping is None:
+            mapping, target_col, _ = map_columns(list(chunk.columns), model, normalized_cols, normalize)
+            if target_col is None:
+                print(f"[WARN] ALPHA_SWEEP requiere la columna objetivo '{model.target}' en {path}; se omite.")
+                return None
+        labels = chunk[target_col].astype(str)
+        with stage(f"sweep_alpha[{n_chunk}]"):
+            sweep = sweep_alpha(model, chunk[list(mapping)].rename(columns=mapping), alphas, labels)
+        correct += sweep.accuracy * len(chunk)
+        loss += sweep.log_loss * len(chunk)
+        total += len(chunk)
+    if not total:
+        return None
+
+    accuracy, log_loss = correct / total, loss / total
+    best = float(sweep.alphas[np.lexsort((log_loss, -accuracy))[0]]) # Mayor exactitud, luego menor pérdida
+    print(f"[OK] Barrido de alpha sobre {path} ({total} instancias):")
+    print(f"  {'alpha':>10}{'exactitud':>12}{'log-loss':>12}")
+    for a, acc, ll in zip(sweep.alphas, accuracy, log_loss):
+        mark = "  <- mejor" if a == best else ""
+        print(f"  {a:>10g}{acc:>12.4f}{ll:>12.4f}{mark}")
+    return best
+# ---------------------------------------------------------------------------------
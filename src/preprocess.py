@@ -10,16 +10,98 @@
 """
 
 from __future__ import annotations
+import numpy as np
 import pandas as pd
 
-# Función para discretizar variables numéricas en intervalos o categorías
+# Interpreta una columna como numérica. En columnas categóricas basta convertir las
+# categorías (valores únicos), no cada fila. Devuelve None si algún valor no es numérico
+def numeric_values(col: pd.Series) -> np.ndarray | None:
+    if pd.api.types.is_bool_dtype(col):
+        return None
+    if pd.api.types.is_numeric_dtype(col):
+        return col.to_numpy(dtype=float)
+
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        cats = pd.to_numeric(pd.Series(col.cat.categories, dtype=object), errors="coerce")
+        if len(cats) == 0 or cats.isna().any():
+            return None
+        codes = col.cat.codes.to_numpy()
+        values = cats.to_numpy(dtype=float)[codes]
+        values[codes < 0] = np.nan
+        return values
+
+    values = pd.to_numeric(col, errors="coerce")
+    if values.isna().sum() > col.isna().sum():
+        return None
+    return values.to_numpy(dtype=float)
+
+# Calcula los bordes de los intervalos: cuantiles o rango uniforme (bordes repetidos se eliminan)
+def compute_edges(values: np.ndarray, bins: int = 5, strategy: str = "quantile") -> np.ndarray:
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return np.array([])
+    if strategy == "quantile":
+        edges = np.quantile(values, np.linspace(0, 1, bins + 1))
+    else:
+        edges = np.linspace(values.min(), values.max(), bins + 1)
+    return np.unique(edges)
+
+# Etiquetas de texto de los intervalos definidos por los bordes. Se usan 6 cifras
+# significativas y más si hace falta para que bordes distintos no se confundan (p. ej.
+# valores del orden de millones); con 17 cifras todo float se distingue. Para unos
+# mismos bordes el resultado es siempre el mismo (el modelo guarda solo los bordes)
+def interval_labels(edges: np.ndarray) -> list[str]:
+    for digits in range(6, 18):
+        text = [f"{e:.{digits}g}" for e in edges]
+        if len(set(text)) == len(text):
+            break
+    labels = []
+    for i, (lo, hi) in enumerate(zip(text[:-1], text[1:])):
+        left = "[" if i == 0 else "("
+        labels.append(f"{left}{lo}, {hi}]")
+    return labels
+
+# Asigna cada valor numérico a su intervalo con np.searchsorted. Los valores fuera del
+# rango de ajuste caen en el primer o último intervalo; NaN queda como faltante
+def apply_edges(values: np.ndarray, edges: np.ndarray) -> pd.Categorical:
+    codes = np.searchsorted(edges[1:-1], values, side="left")
+    codes[np.isnan(values)] = -1
+    return pd.Categorical.from_codes(codes, categories=interval_labels(edges))
+
+# Discretiza valores nuevos (instancias, filas agregadas) con bordes ya calculados.
+# Los valores no numéricos (p. ej. etiquetas ya discretizadas) se conservan sin cambios
+def discretize_values(values: pd.Series, edges: np.ndarray) -> pd.Series:
+    numeric = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+    binned = np.asarray(apply_edges(numeric, edges), dtype=object)
+    keep = np.isnan(numeric)
+    binned[keep] = values.to_numpy(dtype=object)[keep]
+    return pd.Series(binned, index=values.index, name=values.name)
+
+# Convierte a float los atributos numéricos (modo gaussiano) y devuelve cuáles son
+def numeric_attributes(df: pd.DataFrame, attrs: list[str]):
+    df_copy = df.copy()
+    numeric = []
+    for col in attrs:
+        values = numeric_values(df_copy[col])
+        if values is None or np.isnan(values).all():
+            continue
+        df_copy[col] = values
+        numeric.append(col)
+    return df_copy, numeric
+
+# Función para discretizar variables numéricas en intervalos o categorías.
+# Devuelve el DataFrame discretizado y los bordes usados por atributo, que se guardan
+# en el modelo para aplicar los mismos intervalos a las instancias
 def discretize(df: pd.DataFrame, attrs: list[str], bins: int = 5, strategy: str = "quantile"):
-    #Discretiza columnas numéricas de un DataFrame en categorías.
     df_copy = df.copy() # Se trabaja sobre una copia para no alterar el original
+    edges = {}
     for col in attrs:
-        if pd.api.types.is_numeric_dtype(df_copy[col]):
-            if strategy == "quantile":
-                df_copy[col] = pd.qcut(df_copy[col], q=bins, duplicates="drop") # Discretización por cuantiles
-            else:
-                df_copy[col] = pd.cut(df_copy[col], bins=bins) # Discretización uniforme por rango
-    return df_copy # Devuelve el DataFrame con las variables discretizadas
+        values = numeric_values(df_copy[col])
+        if values is None:
+            continue
+        col_edges = compute_edges(values, bins=bins, strategy=strategy)
+        if len(col_edges) < 2:
+            continue # Columna constante o vacía: no hay intervalos que formar
+        df_copy[col] = apply_edges(values, col_edges)
+        edges[col] = col_edges
+    return df_copy, edges # DataFrame con las variables discretizadas y sus bordes
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+src/profiling.py
+ ------------------------------------------------------------
+ Descripción:
+
+Instrumentación por etapas del pipeline (PROFILE=true o --profile). Para cada
+etapa registra tiempo de pared, tiempo de CPU, pico de memoria de Python
+(tracemalloc) y pico de RSS del proceso, y lo guarda como traza JSON.
+Opcionalmente vuelca un perfil de cProfile (.prof) por etapa.
+
+Los módulos marcan sus etapas con `with stage("nombre"):`. Sin un perfilador
+activo, stage() no hace nada, así que la instrumentación no tiene costo en
+una ejecución normal. Las funciones que se ejecutan en un pool de hilos se
+envuelven con bind() para que sus etapas cuelguen de la etapa que las lanzó.
+"""
+
+from __future__ import annotations
+import itertools
+import json
+import os
+import platform
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError: # Windows: sin pico de RSS
+    resource = None
+
+_active: Profiler | None = None # Perfilador en uso (None = instrumentación apagada)
+
+# Pico de RSS del proceso en MB (ru_maxrss está en KB en Linux y en bytes en macOS)
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+# Etapa abierta. parent puede pertenecer a otro hilo (etapas de un pool, ver bind())
+@dataclass(eq=False)
+class _Frame:
+    id: int # Orden de inicio
+    name: str
+    path: str
+    parent: Optional[_Frame]
+    peak: int = 0 # Pico de tracemalloc del proceso mientras la etapa estuvo abierta
+    concurrent: bool = False # Se solapó con otra etapa no relacionada de otro hilo
+
+    # Etapas que contienen a esta (incluidas las de otros hilos)
+    def ancestors(self):
+        f = self.parent
+        while f is not None:
+            yield f
+            f = f.parent
+
+# Registra las etapas anidadas de una ejecución. tracemalloc y el tiempo de CPU son
+# del proceso: si una etapa se solapa con otra de otro hilo que no la contiene ni
+# está contenida en ella, su CPU y su memoria no se pueden atribuir y quedan en null
+# (con "concurrent": true en la traza); el tiempo de pared sí es propio
+class Profiler:
+    def __init__(self, cprofile_dir: str | None = None):
+        self.records: List[Dict[str, object]] = []
+        self._local = threading.local() # Etapas abiertas por hilo y etapa heredada (bind)
+        self._open: List[_Frame] = [] # Etapas abiertas en todos los hilos
+        self._ids = itertools.count()
+        self.cprofile_dir = Path(cprofile_dir) if cprofile_dir else None
+        self.cprofile_on = False # Solo un cProfile puede estar activo: se perfila la etapa más externa
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+
+    # Etapas abiertas en el hilo actual
+    @property
+    def stack(self) -> List[_Frame]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    # Etapa que contiene a las que se abran en este hilo
+    @property
+    def current(self) -> Optional[_Frame]:
+        return self.stack[-1] if self.stack else getattr(self._local, "base", None)
+
+    # Asigna el pico desde la última muestra a todas las etapas abiertas (con _lock tomado)
+    def _sample(self):
+        peak = tracemalloc.get_traced_memory()[1]
+        for f in self._open:
+            f.peak = max(f.peak, peak)
+        tracemalloc.reset_peak()
+
+    # Mide una etapa; las etapas internas quedan con la ruta "externa/interna"
+    @contextmanager
+    def stage(self, name: str):
+        parent = self.current
+        frame = _Frame(next(self._ids), name, f"{parent.path}/{name}" if parent else name, parent)
+        related = set(map(id, frame.ancestors()))
+        with self._lock:
+            self._sample()
+            for other in self._open:
+                if id(other) not in related:
+                    other.concurrent = frame.concurrent = True
+            self._open.append(frame)
+        self.stack.append(frame)
+        prof = None
+        if self.cprofile_dir is not None:
+            with self._lock:
+                if not self.cprofile_on:
+                    import cProfile
+                    prof = cProfile.Profile()
+                    self.cprofile_on = True
+        py_before = tracemalloc.get_traced_memory()[0]
+        wall, cpu = time.perf_counter(), time.process_time()
+        if prof is not None:
+            prof.enable()
+        try:
+            yield
+        finally:
+            if prof is not None:
+                prof.disable()
+                self.cprofile_on = False
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            py_now = tracemalloc.get_traced_memory()[0]
+            with self._lock:
+                self._sample()
+                self._open.remove(frame)
+            self.stack.pop()
+            mb = lambda b: None if frame.concurrent else round(b / (1024 * 1024), 3)
+            self.records.append({
+                "id": frame.id,
+                "parent": frame.parent.id if frame.parent else None,
+                "stage": frame.path,
+                "depth": frame.path.count("/"),
+                "wall_s": round(wall, 6),
+                "cpu_s": None if frame.concurrent else round(cpu, 6),
+                "py_peak_mb": mb(frame.peak),
+                "py_delta_mb": mb(py_now - py_before),
+                "rss_peak_mb": peak_rss_mb(),
+                "concurrent": frame.concurrent,
+            })
+            if prof is not None:
+                self.cprofile_dir.mkdir(parents=True, exist_ok=True)
+                prof.dump_stats(str(self.cprofile_dir / (re.sub(r"[^\w.-]+", "_", frame.path) + ".prof")))
+
+    # Traza completa: metadatos y una entrada por etapa (en orden de finalización)
+    def trace(self) -> Dict[str, object]:
+        return {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "pid": os.getpid(),
+                "argv": sys.argv,
+                "total_s": round(time.perf_counter() - self.started, 6),
+                "rss_peak_mb": peak_rss_mb(),
+            },
+            "stages": self.records,
+        }
+
+    # Guarda la traza JSON
+    def write(self, path: str) -> Path:
+        out = Path(path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(self.trace(), indent=2, ensure_ascii=False), encoding="utf-8")
+        return out
+
+    # Resumen legible (etapas en orden de inicio, con sangría según el anidamiento)
+    def summary(self) -> str:
+        lines = [f"{'etapa':<44}{'pared':>9}{'CPU':>9}{'py pico':>10}{'RSS pico':>10}"]
+        cell = lambda v, spec, unit, width: (format(v, spec) + unit if v is not None else "-").rjust(width)
+        for r in self._start_order():
+            name = "  " * r["depth"] + r["stage"].split("/")[-1] + (" *" if r["concurrent"] else "")
+            lines.append(f"{name:<44}{cell(r['wall_s'], '.3f', 's', 9)}{cell(r['cpu_s'], '.3f', 's', 9)}"
+                         f"{cell(r['py_peak_mb'], '.1f', 'MB', 10)}{cell(r['rss_peak_mb'], '.1f', 'MB', 10)}")
+        if any(r["concurrent"] for r in self.records):
+            lines.append("* etapa simultánea con otra de otro hilo: CPU y memoria no atribuibles")
+        return "\n".join(lines)
+
+    # Registros en orden de inicio: cada etapa padre antes que sus hijas
+    def _start_order(self):
+        children: Dict[int | None, list] = {}
+        for r in sorted(self.records, key=lambda r: r["id"]):
+            children.setdefault(r["parent"], []).append(r)
+        out = []
+        def visit(parent):
+            for r in children.get(parent, []):
+                out.append(r)
+                visit(r["id"])
+        visit(None)
+        return out
+
+# Activa la instrumentación para el resto del proceso
+def start(cprofile_dir: str | None = None) -> Profiler:
+    global _active
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _active = Profiler(cprofile_dir)
+    return _active
+
+# Detiene la instrumentación y devuelve el perfilador usado
+def stop() -> Profiler | None:
+    global _active
+    prof, _active = _active, None
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return prof
+
+# Etapa medida si hay un perfilador activo; si no, un contexto vacío
+def stage(name: str):
+    return _active.stage(name) if _active is not None else nullcontext()
+
+# Envuelve fn para ejecutarla en otro hilo (p. ej. un ThreadPoolExecutor): las etapas
+# que abra quedan dentro de la etapa abierta ahora en el hilo que llama
+def bind(fn: Callable) -> Callable:
+    prof = _active
+    if prof is None:
+        return fn
+    parent = prof.current
+    def run(*args, **kwargs):
+        previous = getattr(prof._local, "base", None)
+        prof._local.base = parent
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            prof._local.base = previous
+    return run
+# ---------------------------------------------------------------------------------
@@ -15,13 +15,24 @@
 """
 
 from __future__ import annotations
+import hashlib
+import json
+import math
+import os
+import shutil
 import subprocess
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
 import pandas as pd
 
-# Plantilla base en LaTeX con secciones para datos, tablas y resultados
-latex_template = r"""
+# Preámbulo y secciones compartidas (dataset, priors y verosimilitudes)
+latex_preamble = r"""
 \documentclass[11pt]{article}
 \usepackage[margin=2.5cm]{geometry}
 \usepackage[spanish]{babel}
@@ -61,7 +72,10 @@ Clase & $P(y)$ \\
 \subsection*{Verosimilitudes $P(A{=}v|y)$}
 %(likelihoods_tables)s
 
-\subsection*{Cálculo para la instancia}
+"""
+
+# Sección de cálculo, posteriores y predicción de una instancia
+instance_template = r"""\subsection*{Cálculo para la instancia}
 Instancia: %(instance)s
 
 %(trace)s
@@ -78,13 +92,48 @@ Clase & $P(y|\mathbf{x})$ \\
 \subsection*{Predicción}
 La clase predicha es: \textbf{%(pred)s}.
 
-\end{document}
+"""
+
+# Plantilla base en LaTeX con secciones para datos, tablas y resultados
+latex_template = latex_preamble + instance_template + r"""\end{document}
+"""
+
+# Sección compacta por instancia para el reporte combinado
+combined_instance_template = r"""
+\subsection*{Instancia %(idx)d}
+Instancia: %(instance)s
+
+%(trace)s
+
+\begin{tabular}{l r}
+\toprule
+Clase & $P(y|\mathbf{x})$ \\
+\midrule
+%(post_rows)s
+\bottomrule
+\end{tabular}
+
+La clase predicha es: \textbf{%(pred)s}.
+"""
+
+# Tabla resumen de predicciones del reporte combinado
+combined_summary_template = r"""
+\subsection*{Resumen de predicciones}
+\begin{tabular}{r l l}
+\toprule
+\# & Instancia & Predicción \\
+\midrule
+%(summary_rows)s
+\bottomrule
+\end{tabular}
 """
 
 
 # Genera una tabla de vista previa del dataset en formato LaTeX
-def dataset_preview_table(df: pd.DataFrame, max_rows: int = 15, max_cols: int = 8) -> str:
+def dataset_preview_table(df: pd.DataFrame, max_rows: int = 15, max_cols: int = 8,
+                          total_rows: int | None = None) -> str:
     rows, cols = df.shape
+    rows = max(rows, total_rows or 0) # df puede ser solo el primer bloque del dataset
     truncated = rows > max_rows or cols > max_cols
     df_disp = df.iloc[:max_rows, :max_cols].copy()
     df_disp.columns = [str(c).replace("_", "\\_") for c in df_disp.columns]
@@ -127,19 +176,79 @@ def _tabular_from_df(df: pd.DataFrame, title: str) -> str:
     return "\n".join(lines)
 
 
+# Recorta una tabla de verosimilitudes de alta cardinalidad: conserva los top_k valores
+# más probables de cada clase y los valores de keep (los de la instancia), y resume el
+# resto en una columna "otros (n)" con su probabilidad acumulada por clase
+def truncate_table(table: pd.DataFrame, top_k: int | None, keep: Iterable[str] = ()) -> pd.DataFrame:
+    if top_k is None or table.shape[1] <= top_k:
+        return table
+    probs = table.to_numpy(dtype=float)
+    top = np.argpartition(-probs, top_k - 1, axis=1)[:, :top_k]
+    selected = np.zeros(probs.shape[1], dtype=bool)
+    selected[top.ravel()] = True
+    selected |= np.isin(np.asarray([str(c) for c in table.columns]), [str(v) for v in keep])
+    if selected.all():
+        return table
+    out = table.loc[:, selected].copy()
+    out[f"otros ({int((~selected).sum())})"] = probs[:, ~selected].sum(axis=1)
+    return out
+
+# Escribe las tablas de verosimilitudes completas en formato largo
+# (atributo, clase, valor, conteo, probabilidad) para consultarlas fuera del PDF
+def write_tables_csv(
+    out_csv: str,
+    attrs: List[str],
+    conds: Dict[str, pd.DataFrame],
+    raw_counts: Dict[str, pd.DataFrame],
+) -> Path:
+    frames = []
+    for a in attrs:
+        if a not in conds:
+            continue # Atributos gaussianos: no tienen tabla de valores
+        probs = conds[a].stack()
+        counts = raw_counts[a].reindex(index=conds[a].index, columns=conds[a].columns).stack()
+        frames.append(pd.DataFrame({
+            "atributo": a,
+            "clase": probs.index.get_level_values(0).astype(str),
+            "valor": probs.index.get_level_values(1).astype(str),
+            "conteo": counts.to_numpy(dtype=np.int64),
+            "probabilidad": probs.to_numpy(dtype=float),
+        }))
+    out_path = Path(out_csv)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    table = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+        columns=["atributo", "clase", "valor", "conteo", "probabilidad"])
+    table.to_csv(out_path, index=False)
+    return out_path
+
+# Densidad normal f(A=v|c) a partir de la tabla de media/varianza por clase.
+# Valores no numéricos o clases sin datos del atributo no aportan (factor 1)
+def _normal_density(table: pd.DataFrame, c: str, v) -> float:
+    try:
+        x = float(v)
+    except (TypeError, ValueError):
+        return 1.0
+    if c not in table.index or not table.loc[c, "varianza"] > 0:
+        return 1.0
+    mean, var = float(table.loc[c, "media"]), float(table.loc[c, "varianza"])
+    return math.exp(-0.5 * (math.log(2 * math.pi * var) + (x - mean) ** 2 / var))
+
 # Construye las ecuaciones del cálculo Bayesiano paso a paso
 def build_trace(
     priors: Dict[str, float],
     conds: Dict[str, pd.DataFrame],
     instance: Dict[str, str],
     posteriors: Dict[str, float] | None = None,
-    raw_counts: Dict[str, pd.DataFrame] | None = None
+    raw_counts: Dict[str, pd.DataFrame] | None = None,
+    gaussian: Dict[str, pd.DataFrame] | None = None,
 ) -> str:
     """
     Construye las expresiones del cálculo paso a paso:
     P(c) × P(A=v|c) = fracciones × fracciones = decimales × decimales = resultado
     Usa breqn (dmath*) para ajuste automático de ecuaciones largas.
+    Los atributos gaussianos usan la densidad normal f(A=v|c) en lugar de una fracción.
     """
+    gaussian = gaussian or {}
     if not instance:
         return "\\textit{No se proporcionó una instancia.}"
 
@@ -172,6 +281,8 @@ def build_trace(
         # P(A=v|y) como fracciones
         if raw_counts:
             for a, v in instance.items():
+                if a in gaussian:
+                    continue
                 tbl = raw_counts[a]
                 if c in tbl.index and str(v) in tbl.columns:
                     num = int(tbl.loc[c, str(v)])
@@ -182,7 +293,10 @@ def build_trace(
         parts = [f"{p_y:.4f}".replace(",", ".")]
         mult_vals = [p_y]
         for a, v in instance.items():
-            p = conds[a].loc[c, str(v)] if (c in conds[a].index and str(v) in conds[a].columns) else 0.0
+            if a in gaussian:
+                p = _normal_density(gaussian[a], c, v)
+            else:
+                p = conds[a].loc[c, str(v)] if (c in conds[a].index and str(v) in conds[a].columns) else 0.0
             parts.append(f"{p:.4f}".replace(",", "."))
             mult_vals.append(p)
 
@@ -198,7 +312,7 @@ def build_trace(
 
         base_expr = (
             f"P({c}) \\times " +
-            " \\times ".join([f"P({a}={v}|{c})" for a, v in instance.items()]) + " = " +
+            " \\times ".join([f"{'f' if a in gaussian else 'P'}({a}={v}|{c})" for a, v in instance.items()]) + " = " +
             (frac_expr + " = " if frac_expr else "") +
             f"{dec_expr} = {prod_str}"
         )
@@ -226,28 +340,45 @@ def build_trace(
 
     return "\n".join(lines)
 
-# Genera el archivo TEX y compila a PDF con pdflatex/xelatex
-def render_pdf(
-    out_pdf: str,
-    df: pd.DataFrame,
+# Tabla LaTeX de verosimilitudes de un atributo (normal por clase o tabla recortada)
+def _likelihood_table(attr: str, conds, gaussian, top_k: int | None, keep: Iterable[str] = ()) -> str:
+    if gaussian and attr in gaussian:
+        return _tabular_from_df(gaussian[attr], f"Atributo: {attr} (normal por clase)")
+    return _tabular_from_df(truncate_table(conds[attr], top_k, keep), f"Atributo: {attr}")
+
+# Campos de las secciones compartidas: resumen, vista previa, priors y verosimilitudes.
+# Sin DataFrame (p. ej. con un modelo cargado de disco) las dimensiones se obtienen de
+# los conteos; total_rows corrige el número de filas cuando df es solo una muestra
+# del dataset (lectura por bloques). Con top_k, las tablas de verosimilitudes se
+# recortan a los valores más probables y a los de keep (valores de las instancias).
+# tables: tablas de verosimilitudes ya generadas por atributo (se usan tal cual)
+def _shared_fields(
+    df: pd.DataFrame | None,
     target: str,
     attrs: List[str],
     priors: Dict[str, float],
     conds: Dict[str, pd.DataFrame],
-    instance: Dict[str, str],
-    posteriors: Dict[str, float],
     raw_counts: Dict[str, pd.DataFrame] | None = None,
-):
-    # Preparación de datos y tablas
-    rows, cols = df.shape
+    total_rows: int | None = None,
+    gaussian: Dict[str, pd.DataFrame] | None = None,
+    top_k: int | None = None,
+    keep: Dict[str, List[str]] | None = None,
+    tables: Dict[str, str] | None = None,
+) -> Dict[str, object]:
+    if df is not None:
+        rows, cols = df.shape
+    else:
+        rows = int(next(iter(raw_counts.values())).to_numpy().sum()) if raw_counts else 0
+        cols = len(attrs) + 1
+    if total_rows is not None:
+        rows = total_rows
     priors_rows = "\n".join(f"{c} & {p:.6f}".replace(",", ".") + " \\\\" for c, p in priors.items())
-    like_tables = "\n\n".join(_tabular_from_df(conds[a], f"Atributo: {a}") for a in attrs)
-    post_rows = "\n".join(f"{c} & {p:.6f}".replace(",", ".") + " \\\\" for c, p in posteriors.items())
-    pred = max(posteriors, key=posteriors.get) if posteriors else "—"
-    dataset_table = dataset_preview_table(df)
-
-    # Inserta los valores en la plantilla LaTeX
-    tex_content = latex_template % {
+    if tables is None:
+        tables = {a: _likelihood_table(a, conds, gaussian, top_k, (keep or {}).get(a, ())) for a in attrs}
+    like_tables = "\n\n".join(tables[a] for a in attrs)
+    dataset_table = (dataset_preview_table(df, total_rows=rows) if df is not None
+                     else "\\textit{Vista previa no disponible: el modelo se cargó desde disco.}")
+    return {
         "rows": rows,
         "cols": cols,
         "attrs": ", ".join(attrs),
@@ -255,32 +386,277 @@ def render_pdf(
         "dataset_table": dataset_table,
         "priors_rows": priors_rows,
         "likelihoods_tables": like_tables,
+    }
+
+# Versión del formato de los fragmentos en caché (cambiarla invalida los guardados)
+FRAGMENT_VERSION = 2
+FRAGMENT_MEMO_SIZE = 32 # Fragmentos conservados en memoria (LRU)
+FRAGMENT_DISK_LIMIT = 64 # Archivos conservados en cada .fragments/ (se borran los menos usados)
+_fragment_memo: OrderedDict[str, Dict[str, object]] = OrderedDict()
+_fragment_lock = threading.Lock() # Los experimentos generan reportes desde varios hilos
+
+# Deja en .fragments/ solo los FRAGMENT_DISK_LIMIT archivos usados más recientemente
+def _prune_fragments(folder: Path):
+    try:
+        files = sorted(folder.glob("*.json"), key=lambda f: f.stat().st_mtime, reverse=True)
+        for f in files[FRAGMENT_DISK_LIMIT:]:
+            f.unlink()
+    except OSError:
+        pass
+
+# Fragmentos que no dependen de la instancia: secciones compartidas sin tablas de
+# verosimilitudes, la tabla recortada solo a top_k de cada atributo y, si la tabla se
+# recortó, las columnas que muestra (None = tabla completa)
+def _base_fragment(df, target, attrs, priors, conds, raw_counts, total_rows, gaussian, top_k):
+    tables, shown = {}, {}
+    for a in attrs:
+        tables[a] = _likelihood_table(a, conds, gaussian, top_k)
+        shown[a] = None
+        if not (gaussian and a in gaussian) and top_k is not None:
+            t = truncate_table(conds[a], top_k)
+            if t is not conds[a]:
+                shown[a] = [str(c) for c in t.columns[:-1]] # Sin la columna "otros (n)"
+    fields = _shared_fields(df, target, attrs, priors, conds, raw_counts, total_rows, gaussian, tables=tables)
+    fields.pop("likelihoods_tables")
+    fields["likelihood_parts"], fields["shown_columns"] = tables, shown
+    return fields
+
+# Campos compartidos con caché de fragmentos. La clave combina la huella del modelo
+# (priors, conteos y verosimilitudes dependen solo de él) con las opciones del reporte
+# y las filas visibles de la vista previa, pero no con la instancia: los valores de la
+# instancia que la tabla recortada no muestra se agregan en cada llamada (sin guardarse).
+# Se guarda en memoria y en un archivo JSON dentro de .fragments/, junto al .tex de
+# salida, para reutilizarlo entre ejecuciones; ambos cachés tienen tamaño acotado
+def _cached_shared_fields(out_pdf: str, fingerprint: str | None, df, target, attrs, priors, conds,
+                          raw_counts=None, total_rows=None, gaussian=None, top_k=None,
+                          keep=None) -> Dict[str, object]:
+    if fingerprint is None:
+        return _shared_fields(df, target, attrs, priors, conds, raw_counts, total_rows, gaussian,
+                              top_k, keep)
+
+    preview = None if df is None else [list(df.shape), df.iloc[:15, :8].astype(str).values.tolist(),
+                                       [str(c) for c in df.columns[:8]]]
+    options = [FRAGMENT_VERSION, fingerprint, target, list(attrs), total_rows, preview, top_k]
+    key = hashlib.sha1(json.dumps(options, ensure_ascii=False).encode("utf-8")).hexdigest()
+    with _fragment_lock:
+        fields = _fragment_memo.get(key)
+        if fields is not None:
+            _fragment_memo.move_to_end(key)
+    if fields is None:
+        cache_file = Path(out_pdf).parent / ".fragments" / f"{key}.json"
+        if cache_file.exists():
+            try:
+                fields = json.loads(cache_file.read_text(encoding="utf-8"))
+                os.utime(cache_file)
+            except (OSError, ValueError):
+                fields = None
+        if fields is None:
+            fields = _base_fragment(df, target, attrs, priors, conds, raw_counts, total_rows, gaussian, top_k)
+            try:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                cache_file.write_text(json.dumps(fields, ensure_ascii=False), encoding="utf-8")
+                _prune_fragments(cache_file.parent)
+            except OSError:
+                pass # El caché es opcional: si no se puede escribir, se sigue sin él
+        fields["shown_columns"] = {a: None if v is None else set(v) for a, v in fields["shown_columns"].items()}
+        with _fragment_lock:
+            _fragment_memo[key] = fields
+            while len(_fragment_memo) > FRAGMENT_MEMO_SIZE:
+                _fragment_memo.popitem(last=False)
+
+    # Tablas recortadas que no muestran algún valor de la instancia: se rehacen solo esas
+    out = {k: v for k, v in fields.items() if k not in ("likelihood_parts", "shown_columns")}
+    parts = []
+    for a in attrs:
+        shown = fields["shown_columns"][a]
+        wanted = [str(v) for v in (keep or {}).get(a, ())]
+        if shown is not None and any(v not in shown and v in conds[a].columns for v in wanted):
+            parts.append(_likelihood_table(a, conds, gaussian, top_k, wanted))
+        else:
+            parts.append(fields["likelihood_parts"][a])
+    out["likelihoods_tables"] = "\n\n".join(parts)
+    return out
+
+# Campos de la sección de una instancia: cálculo paso a paso, posteriores y predicción
+def _instance_fields(
+    priors: Dict[str, float],
+    conds: Dict[str, pd.DataFrame],
+    instance: Dict[str, str],
+    posteriors: Dict[str, float],
+    raw_counts: Dict[str, pd.DataFrame] | None = None,
+    gaussian: Dict[str, pd.DataFrame] | None = None,
+) -> Dict[str, object]:
+    post_rows = "\n".join(f"{c} & {p:.6f}".replace(",", ".") + " \\\\" for c, p in posteriors.items())
+    pred = max(posteriors, key=posteriors.get) if posteriors else "—"
+    return {
         "instance": ", ".join(f"{k}={v}" for k, v in instance.items()),
-        "trace": build_trace(priors, conds, instance, posteriors, raw_counts),
+        "trace": build_trace(priors, conds, instance, posteriors, raw_counts, gaussian),
         "post_rows": post_rows,
         "pred": pred,
     }
 
-    # Escribe el archivo .tex y crea carpeta si no existe
+# Escribe el contenido .tex junto al PDF de salida (crea la carpeta si no existe)
+def _write(out_pdf: str, tex_content: str) -> Path:
     out_pdf_path = Path(out_pdf)
     out_pdf_path.parent.mkdir(parents=True, exist_ok=True)
     tex_path = out_pdf_path.with_suffix(".tex")
     tex_path.write_text(tex_content, encoding="utf-8")
+    return tex_path
 
-    # Intenta compilar a PDF con xelatex o pdflatex
+# Genera el archivo TEX del reporte (sin compilar) y devuelve su ruta
+def write_tex(
+    out_pdf: str,
+    df: pd.DataFrame | None,
+    target: str,
+    attrs: List[str],
+    priors: Dict[str, float],
+    conds: Dict[str, pd.DataFrame],
+    instance: Dict[str, str],
+    posteriors: Dict[str, float],
+    raw_counts: Dict[str, pd.DataFrame] | None = None,
+    total_rows: int | None = None,
+    gaussian: Dict[str, pd.DataFrame] | None = None,
+    fingerprint: str | None = None,
+    top_k: int | None = None,
+) -> Path:
+    # Inserta los valores en la plantilla LaTeX (secciones compartidas desde el caché
+    # de fragmentos si se indica la huella del modelo)
+    keep = {a: [str(v)] for a, v in instance.items()}
+    fields = _cached_shared_fields(out_pdf, fingerprint, df, target, attrs, priors, conds,
+                                   raw_counts, total_rows, gaussian, top_k, keep)
+    fields.update(_instance_fields(priors, conds, instance, posteriors, raw_counts, gaussian))
+    return _write(out_pdf, latex_template % fields)
+
+# Genera un único TEX para varias instancias: las secciones compartidas se escriben
+# una vez y cada instancia aporta solo su cálculo, posteriores y predicción.
+# results: lista de (número de instancia, instancia, posteriores)
+def write_combined_tex(
+    out_pdf: str,
+    df: pd.DataFrame | None,
+    target: str,
+    attrs: List[str],
+    priors: Dict[str, float],
+    conds: Dict[str, pd.DataFrame],
+    results: List[Tuple[int, Dict[str, str], Dict[str, float]]],
+    raw_counts: Dict[str, pd.DataFrame] | None = None,
+    total_rows: int | None = None,
+    gaussian: Dict[str, pd.DataFrame] | None = None,
+    fingerprint: str | None = None,
+    top_k: int | None = None,
+) -> Path:
+    keep: Dict[str, set] = {}
+    for _, instance, _ in results:
+        for a, v in instance.items():
+            keep.setdefault(a, set()).add(str(v))
+    shared = _cached_shared_fields(out_pdf, fingerprint, df, target, attrs, priors, conds,
+                                   raw_counts, total_rows, gaussian, top_k, keep)
+    parts = [latex_preamble % shared]
+
+    summary_rows = []
+    for idx, instance, posteriors in results:
+        fields = _instance_fields(priors, conds, instance, posteriors, raw_counts, gaussian)
+        summary_rows.append(f"{idx} & {fields['instance']} & {fields['pred']} \\\\")
+        parts.append(combined_instance_template % dict(fields, idx=idx))
+    parts.insert(1, combined_summary_template % {"summary_rows": "\n".join(summary_rows)})
+
+    parts.append("\\end{document}\n")
+    return _write(out_pdf, "".join(parts))
+
+# Motor de LaTeX disponible (xelatex o pdflatex); se busca una sola vez por proceso
+@lru_cache(maxsize=None)
+def latex_engine() -> str | None:
     for binname in ("xelatex", "pdflatex"):
-        try:
-            subprocess.run(
-                [binname, "-interaction=nonstopmode", tex_path.name],
-                cwd=tex_path.parent,
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-            )
-            return
-        except Exception:
-            continue
-
-# Aviso si no se logra compilar el PDF
-    print(f"[WARN] No se pudo compilar PDF, se dejó el archivo TEX en: {tex_path}")
-
+        if shutil.which(binname):
+            return binname
+    return None
+
+# Archivo (oculto, junto al .tex) donde se registra el hash del último .tex compilado
+def _build_stamp(tex_path: Path) -> Path:
+    return tex_path.parent / f".{tex_path.stem}.build.json"
+
+# Hash del contenido del .tex junto con el motor que lo compilaría
+def _build_key(tex_path: Path, engine: str) -> Dict[str, str]:
+    digest = hashlib.sha256(tex_path.read_bytes()).hexdigest()
+    return {"sha256": digest, "engine": engine}
+
+# True si el PDF existe y fue compilado a partir de un .tex idéntico con el mismo motor
+def is_up_to_date(tex_path: Path, engine: str | None = None) -> bool:
+    engine = engine or latex_engine()
+    stamp = _build_stamp(tex_path)
+    if engine is None or not stamp.exists() or not tex_path.with_suffix(".pdf").exists():
+        return False
+    try:
+        return json.loads(stamp.read_text(encoding="utf-8")) == _build_key(tex_path, engine)
+    except (OSError, ValueError):
+        return False
+
+# Compila un .tex a PDF con el motor detectado; devuelve (éxito, segundos).
+# Tras una compilación correcta se guarda el hash del .tex para omitirla la próxima vez
+def compile_tex(tex_path: Path) -> Tuple[bool, float]:
+    engine = latex_engine()
+    if engine is None:
+        return False, 0.0
+    start = time.perf_counter()
+    try:
+        subprocess.run(
+            [engine, "-interaction=nonstopmode", tex_path.name],
+            cwd=tex_path.parent,
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        ok = True
+    except (OSError, subprocess.CalledProcessError):
+        ok = False
+    if ok and tex_path.with_suffix(".pdf").exists():
+        _build_stamp(tex_path).write_text(json.dumps(_build_key(tex_path, engine)), encoding="utf-8")
+    return ok, time.perf_counter() - start
+
+# Compila varios .tex en paralelo con un número acotado de procesos de LaTeX
+# e imprime un resumen con el tiempo de cada reporte. Los reportes cuyo .tex no
+# cambió desde la última compilación se omiten, salvo con force=True
+def compile_all(tex_paths: List[Path], workers: int | None = None, force: bool = False) -> Dict[Path, bool]:
+    if not tex_paths:
+        return {}
+    engine = latex_engine()
+    if engine is None:
+        print("[WARN] No se encontró xelatex ni pdflatex; se dejaron los archivos TEX:")
+        for tex in tex_paths:
+            print(f"         {tex}")
+        return {tex: False for tex in tex_paths}
+
+    skipped = [] if force else [tex for tex in tex_paths if is_up_to_date(tex, engine)]
+    pending = [tex for tex in tex_paths if tex not in skipped]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending) or 1))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = dict(zip(pending, pool.map(compile_tex, pending)))
+    total = time.perf_counter() - start
+
+    done = sum(ok for ok, _ in results.values())
+    print(f"[OK] PDF compilados con {engine}: {done}/{len(pending)} en {total:.2f} s ({workers} procesos)"
+          + (f", {len(skipped)} sin cambios" if skipped else ""))
+    for tex in tex_paths:
+        if tex in results:
+            ok, secs = results[tex]
+            status = "[OK]" if ok else "[ERROR]"
+            print(f"  {status:<8}{tex.with_suffix('.pdf').name:<30} {secs:6.2f} s")
+        else:
+            print(f"  {'[SKIP]':<8}{tex.with_suffix('.pdf').name:<30} sin cambios")
+    for tex, (ok, _) in results.items():
+        if not ok:
+            print(f"[WARN] No se pudo compilar PDF, se dejó el archivo TEX en: {tex}")
+    status = {tex: True for tex in skipped}
+    status.update({tex: ok for tex, (ok, _) in results.items()})
+    return status
+
+# Genera el archivo TEX y compila a PDF (mismos argumentos que write_tex); si el .tex
+# no cambió y el PDF existe, no se vuelve a compilar salvo con force=True
+def render_pdf(*args, force: bool = False, **kwargs):
+    tex_path = write_tex(*args, **kwargs)
+    if not force and is_up_to_date(tex_path):
+        print(f"[OK] PDF sin cambios, se omite la compilación: {tex_path.with_suffix('.pdf')}")
+        return
+    ok, _ = compile_tex(tex_path)
+    if not ok:
+        print(f"[WARN] No se pudo compilar PDF, se dejó el archivo TEX en: {tex_path}")
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+src/serve.py
+ ------------------------------------------------------------
+ Descripción:
+
+Servidor de clasificación de larga duración. Carga o ajusta el modelo una sola
+vez (misma configuración que src.main) y responde peticiones JSON por HTTP en
+un puerto local o en un socket Unix (asyncio).
+
+Las peticiones concurrentes se agrupan en lotes y se evalúan con una sola
+llamada vectorizada a predict_batch.
+
+Uso:
+    python -m src.serve input.txt [--host 127.0.0.1] [--port 8765] [--unix RUTA]
+
+Endpoints:
+    POST /predict   {"instance": {"Artista": "Queen", ...}}
+                    {"instances": [{...}, {...}]}
+    GET  /health    estado y datos básicos del modelo
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+import pandas as pd
+from .config import Config
+from .bayes import NaiveBayesModel, predict_batch
+from .main import build_model, normalize_instance
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+MAX_BODY = 8 * 1024 * 1024 # Tamaño máximo del cuerpo de una petición (bytes)
+
+# Agrupa las instancias que llegan casi al mismo tiempo y las evalúa juntas.
+# Cada petición deja (instancia, future) en la cola; el bucle de lotes espera hasta
+# max_wait segundos o max_batch instancias y resuelve todos los futures de una vez
+@dataclass
+class Batcher:
+    model: NaiveBayesModel
+    max_batch: int = 256
+    max_wait: float = 0.005
+    queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+    batches: int = 0
+    scored: int = 0
+
+    # Encola una instancia (ya normalizada) y espera su resultado
+    async def submit(self, instance: Dict[str, str]) -> Tuple[str, Dict[str, float]]:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((instance, future))
+        return await future
+
+    # Bucle principal: junta un lote y lo evalúa con predict_batch
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self._score(batch)
+
+    # Evalúa un lote y entrega cada resultado a su future
+    def _score(self, batch: List[Tuple[Dict[str, str], asyncio.Future]]):
+        try:
+            frame = pd.DataFrame([inst for inst, _ in batch], dtype=object)
+            result = predict_batch(self.model, frame)
+        except Exception as e: # Un error del lote se informa a todas sus peticiones
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.scored += len(batch)
+        for row, (_, future) in enumerate(batch):
+            if not future.done():
+                posteriors = {c: float(p) for c, p in zip(result.classes, result.posteriors[row])}
+                future.set_result((str(result.predictions[row]), posteriors))
+
+# Servidor HTTP mínimo (HTTP/1.1 con keep-alive) sobre asyncio
+class ScoringServer:
+    def __init__(self, model: NaiveBayesModel, normalized_cols: Dict[str, str],
+                 max_batch: int = 256, max_wait: float = 0.005):
+        self.model = model
+        # Solo se aceptan atributos del modelo (la clase objetivo no forma parte de la instancia)
+        self.normalized_cols = {k: c for k, c in normalized_cols.items() if c in model.attrs}
+        self.batcher = Batcher(model, max_batch=max_batch, max_wait=max_wait)
+        self.started = time.time()
+
+    # Clasifica una instancia: normaliza nombres, la encola y arma la respuesta
+    async def classify(self, inst: Dict[str, object]) -> Dict[str, object]:
+        if not isinstance(inst, dict):
+            raise ValueError("Cada instancia debe ser un objeto JSON {atributo: valor}.")
+        nested = [str(k) for k, v in inst.items() if isinstance(v, (list, dict))]
+        if nested:
+            raise ValueError(f"Los valores deben ser escalares (texto, número o null): {', '.join(nested)}")
+        # null = valor ausente: se omite y queda neutro, como una celda vacía en INSTANCES_FILE
+        inst_norm, unknown = normalize_instance({str(k): str(v) for k, v in inst.items() if v is not None},
+                                                self.normalized_cols)
+        prediction, posteriors = await self.batcher.submit(inst_norm)
+        response = {"instance": inst_norm, "prediction": prediction, "posteriors": posteriors}
+        if unknown:
+            response["ignored"] = unknown
+        return response
+
+    # Atiende una petición ya leída; devuelve (código HTTP, cuerpo JSON)
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, object]]:
+        if path == "/health":
+            return 200, {
+                "status": "ok",
+                "target": self.model.target,
+                "attrs": list(self.model.attrs),
+                "classes": list(self.model.ranked_classes),
+                "rows": self.model.n_rows,
+                "uptime": round(time.time() - self.started, 3),
+                "batches": self.batcher.batches,
+                "scored": self.batcher.scored,
+            }
+        if path != "/predict":
+            return 404, {"error": f"Ruta no encontrada: {path}"}
+        if method != "POST":
+            return 405, {"error": "Usa POST en /predict"}
+        try:
+            payload = json.loads(body or b"{}")
+            if "instances" in payload:
+                results = await asyncio.gather(*(self.classify(i) for i in payload["instances"]))
+                return 200, {"results": list(results)}
+            if "instance" in payload:
+                return 200, await self.classify(payload["instance"])
+            return 400, {"error": "Se esperaba 'instance' o 'instances' en el cuerpo JSON."}
+        except (ValueError, TypeError, AttributeError) as e:
+            return 400, {"error": str(e)}
+
+    # Conexión de un cliente: lee peticiones hasta que se cierre (keep-alive)
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Línea de petición inválida"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                    if length < 0:
+                        raise ValueError
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Content-Length inválido"}, False)
+                    break
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {"error": "Cuerpo demasiado grande"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version.upper() == "HTTP/1.1")
+                try:
+                    status, payload = await self.dispatch(method.upper(), path.split("?")[0], body)
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    # Escribe una respuesta HTTP con cuerpo JSON
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: Dict[str, object],
+                       keep_alive: bool):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    # Arranca el bucle de lotes y el servidor (TCP o socket Unix) hasta interrumpirlo
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765, unix: str | None = None):
+        batch_task = asyncio.create_task(self.batcher.run())
+        if unix:
+            server = await asyncio.start_unix_server(self.handle, path=unix)
+            where = f"unix:{unix}"
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            where = f"http://{host}:{port}"
+        print(f"[OK] Servidor de clasificación escuchando en {where}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batch_task.cancel()
+
+# Punto de entrada: python -m src.serve input.txt
+def main():
+    parser = argparse.ArgumentParser(prog="python -m src.serve",
+                                     description="Servidor JSON del clasificador Naive Bayes")
+    parser.add_argument("input", help="archivo de configuración (ej. input.txt)")
+    parser.add_argument("--host", default="127.0.0.1", help="dirección TCP (por defecto 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="puerto TCP (por defecto 8765)")
+    parser.add_argument("--unix", help="ruta de un socket Unix (en lugar de TCP)")
+    parser.add_argument("--max-batch", type=int, default=256, help="instancias máximas por lote")
+    parser.add_argument("--batch-ms", type=float, default=5.0,
+                        help="espera máxima (ms) para completar un lote")
+    args = parser.parse_args()
+
+    model, _, _, _, normalized_cols = build_model(Config(args.input))
+    server = ScoringServer(model, normalized_cols, max_batch=max(1, args.max_batch),
+                           max_wait=max(0.0, args.batch_ms) / 1000)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        print("\n[OK] Servidor detenido.")
+
+# Punto de entrada del script
+if __name__ == "__main__":
+    main()
+# ---------------------------------------------------------------------------------
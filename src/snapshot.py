@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ src/snapshot.py
+ ------------------------------------------------------------
+ Descripción:
+
+ Caché en disco de la tabla ya detectada de hojas de cálculo
+ (ODS, XLSX). Cada entrada guarda las columnas en formato
+ columnar: un arreglo .npy de códigos enteros por columna y un
+ encabezado JSON con los nombres y las categorías. La clave
+ combina ruta, fecha de modificación, tamaño y hoja, de modo que
+ cualquier cambio del archivo invalida la entrada. El tamaño
+ total del caché se limita desalojando las entradas menos usadas.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_VERSION = 1
+HEADER_FILE = "header.json"
+
+# Identidad del origen: ruta absoluta, hoja y opciones de detección de la tabla
+def _source_id(path: Path, sheet: str | None, trim_trailing: bool) -> str:
+    return json.dumps([str(path.resolve()), sheet, trim_trailing, SNAPSHOT_VERSION])
+
+# Clave completa de la entrada: identidad del origen más mtime y tamaño del archivo
+def snapshot_key(path: str, sheet: str | None = None, trim_trailing: bool = False) -> str:
+    p = Path(path)
+    st = p.stat()
+    raw = json.dumps([_source_id(p, sheet, trim_trailing), st.st_mtime_ns, st.st_size])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+# Lee una entrada del caché; devuelve None si no existe o está incompleta
+def read_snapshot(cache_dir: str, key: str) -> pd.DataFrame | None:
+    entry = Path(cache_dir) / key
+    header_path = entry / HEADER_FILE
+    if not header_path.exists():
+        return None
+    try:
+        header = json.loads(header_path.read_text(encoding="utf-8"))
+        data = {}
+        for i, col in enumerate(header["columns"]):
+            codes = np.load(entry / f"col_{i:03d}.npy")
+            categories = pd.Index(header["categories"][i], dtype=object)
+            data[i] = pd.Categorical.from_codes(codes, categories=categories)
+    except (OSError, ValueError, KeyError):
+        return None
+
+    os.utime(header_path) # Marca de último uso para el desalojo LRU
+    df = pd.DataFrame(data)
+    df.columns = header["columns"]
+    return df
+
+# Guarda la tabla detectada como entrada del caché y aplica la política de tamaño
+def write_snapshot(cache_dir: str, key: str, df: pd.DataFrame, path: str,
+                   sheet: str | None = None, trim_trailing: bool = False,
+                   max_bytes: int | None = None) -> None:
+    root = Path(cache_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    source = _source_id(Path(path), sheet, trim_trailing)
+
+    # Se escribe en un directorio temporal y se renombra al final (escritura atómica)
+    tmp = root / f".{key}.tmp{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir()
+    categories = []
+    for i in range(df.shape[1]):
+        col = df.iloc[:, i]
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            codes, uniques = col.cat.codes.to_numpy(), col.cat.categories
+        else:
+            codes, uniques = pd.factorize(col)
+        np.save(tmp / f"col_{i:03d}.npy", codes.astype(np.int32))
+        categories.append([str(u) for u in uniques])
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "source": source,
+        "columns": [str(c) for c in df.columns],
+        "categories": categories,
+    }
+    (tmp / HEADER_FILE).write_text(json.dumps(header, ensure_ascii=False), encoding="utf-8")
+
+    entry = root / key
+    shutil.rmtree(entry, ignore_errors=True)
+    tmp.rename(entry)
+
+    # Invalida versiones anteriores del mismo origen (archivo modificado desde entonces)
+    for other in root.iterdir():
+        if other.name == key or other.name.startswith("."):
+            continue
+        try:
+            other_header = json.loads((other / HEADER_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if other_header.get("source") == source:
+            shutil.rmtree(other, ignore_errors=True)
+
+    if max_bytes is not None:
+        evict(cache_dir, max_bytes, keep=key)
+
+# Tamaño total en bytes de una entrada
+def _entry_size(entry: Path) -> int:
+    return sum(f.stat().st_size for f in entry.iterdir() if f.is_file())
+
+# Desaloja entradas, de la menos a la más recientemente usada, hasta no superar max_bytes
+def evict(cache_dir: str, max_bytes: int, keep: str | None = None) -> None:
+    root = Path(cache_dir)
+    if not root.exists():
+        return
+    entries = []
+    for entry in root.iterdir():
+        header_path = entry / HEADER_FILE
+        if entry.name.startswith(".") or not header_path.exists():
+            continue
+        entries.append((header_path.stat().st_mtime, entry, _entry_size(entry)))
+
+    total = sum(size for _, _, size in entries)
+    for _, entry, size in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        if entry.name == keep:
+            continue
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+
+# Elimina por completo el caché
+def clear_cache(cache_dir: str) -> None:
+    shutil.rmtree(cache_dir, ignore_errors=True)
+# ---------------------------------------------------------------------------------
@@ -9,8 +9,18 @@
 """
 
 from __future__ import annotations
+import importlib
 from typing import Dict, Any
 
+# Módulo que se importa recién al usar uno de sus atributos (p. ej. pd.DataFrame).
+# Permite que el camino de solo puntuación no cargue pandas al arrancar
+class LazyModule:
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, attr: str):
+        return getattr(importlib.import_module(self._name), attr)
+
 # Normaliza los nombres de columnas
 def normalize_colnames(cols):
     # Devuelve nombres tal cual (sin modificar).